@@ -3,11 +3,7 @@
 __version__ = "0.1.0"
 __author__ = "Alexander Hinton"
 
-from .amazon.auth import AmazonAuth
-from .amazon.checkout import CheckoutHandler
-from .amazon.product import ProductChecker
 from .config.settings import Config
-from .core.monitor import PreorderMonitor, BrowserManager
 
 __all__ = [
     "Config",
@@ -16,4 +12,23 @@ __all__ = [
     "AmazonAuth",
     "ProductChecker",
     "CheckoutHandler"
-]
\ No newline at end of file
+]
+
+# Selenium-backed classes are imported on first access so that importing the
+# package (e.g. for Config alone) does not pull in Selenium.
+_LAZY_IMPORTS = {
+    "AmazonAuth": ".amazon.auth",
+    "CheckoutHandler": ".amazon.checkout",
+    "ProductChecker": ".amazon.product",
+    "PreorderMonitor": ".core.monitor",
+    "BrowserManager": ".core.monitor",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_IMPORTS:
+        from importlib import import_module
+        value = getattr(import_module(_LAZY_IMPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,11 +1,15 @@
-"""Amazon authentication and session management."""
+"""
+Amazon authentication and session management.
+
+Assumes the driver's implicit wait is 0 (see BrowserManager); anything that
+needs to poll uses an explicit WebDriverWait.
+"""
 import logging
-import time
+import re
 from typing import Optional
 
 from selenium.common.exceptions import (
     TimeoutException,
-    NoSuchElementException,
     WebDriverException, StaleElementReferenceException
 )
 from selenium.webdriver.common.by import By
@@ -15,6 +19,53 @@ from selenium.webdriver.support.ui import WebDriverWait
 from ..config.settings import Config
 from ..exceptions import ElementNotFoundError
 from ..security.password_manager import PasswordManager
+from .checkout import XPATH_MATCHES_SCRIPT
+
+# Page-source phrases, matched against lowercased page source in a single pass
+CAPTCHA_RE = re.compile("|".join(map(re.escape, [
+    "captcha",
+    "enter the characters you see below",
+    "enter the characters you see above",
+    "type the characters you see in this image",
+    "bot check",
+    "sorry, we just need to make sure you're not a robot",
+    "verify your identity",
+    "enter the text you see above",
+    "unusual activity"
+])))
+SECURITY_VERIFICATION_RE = re.compile(
+    r"additional security verification|we need to verify your identity"
+)
+BLOCKED_PAGE_RE = re.compile(r"captcha|unusual traffic")
+SIGN_IN_RE = re.compile(r"hello, sign in|sign in to your account|sign in")
+
+# Selector unions, built once and sent as a single query
+LOGGED_IN_INDICATOR_XPATH = " | ".join((
+    "//span[contains(text(), 'Hello,')]",
+    "//a[contains(@id, 'nav-link-accountList')]//span[contains(text(), 'Account')]",
+    "//*[@id='nav-link-accountList-nav-line-1']",
+    "//a[contains(@href, '/gp/css/homepage')]",
+    "//span[contains(text(), 'Account & Lists')]",
+    "//a[contains(@href, '/gp/css/order-history')]"
+))
+
+# Form controls in priority order, evaluated in one round-trip by XPATH_MATCHES_SCRIPT
+EMAIL_FIELD_XPATHS = (
+    "//*[@id='ap_email']",
+    "//input[@type='email']",
+    "//*[@name='email']",
+    "//input[contains(@placeholder, 'email') or contains(@placeholder, 'mobile')]",
+    "//input[contains(@autocomplete, 'email')]",
+    "//input[@type='text']"
+)
+SIGN_IN_BUTTON_XPATHS = (
+    "//*[@id='signInSubmit']",
+    "//*[@name='signInSubmit']",
+    "//input[contains(@value, 'Sign-In')]",
+    "//button[contains(text(), 'Sign-In')]",
+    "//span[contains(text(), 'Sign-In')]",
+    "//*[@type='submit']"
+)
 
 
 class AmazonAuth:
@@ -24,6 +75,8 @@ class AmazonAuth:
         self.config = config
         self.logger = logging.getLogger(__name__)
         self.password_manager = PasswordManager()
+        self._secure_password = None
+        self._secure_password_source = None
 
     def login(self, driver) -> bool:
         """
@@ -47,8 +100,8 @@ class AmazonAuth:
     def is_session_valid(self, driver) -> bool:
         """Check if the current Amazon session is still valid."""
         try:
-            driver.get("https://www.amazon.com")
-            time.sleep(2)
+            driver.get(self.config.storefront)
+            self._wait_for_page_load(driver)
 
             # DEBUG: Log current URL and page title
             self.logger.info(f"Session check - URL: {driver.current_url}")
@@ -56,43 +109,23 @@ class AmazonAuth:
 
             # DEBUG: Check if we're on a problem page
             page_source_lower = driver.page_source.lower()
-            if "captcha" in page_source_lower:
-                self.logger.warning("Session check - CAPTCHA page detected")
-                return False
-            if "unusual traffic" in page_source_lower:
-                self.logger.warning("Session check - Unusual traffic page detected")
+            blocked = BLOCKED_PAGE_RE.search(page_source_lower)
+            if blocked:
+                self.logger.warning(f"Session check - '{blocked.group()}' page detected")
                 return False
 
-            # Check for positive indicators that we ARE logged in
-            positive_indicators = [
-                driver.find_elements(By.XPATH, "//span[contains(text(), 'Hello,')]"),
-                driver.find_elements(By.XPATH, "//a[contains(@id, 'nav-link-accountList')]//span[contains(text(), 'Account')]"),
-                driver.find_elements(By.ID, "nav-link-accountList-nav-line-1"),
-                driver.find_elements(By.XPATH, "//a[contains(@href, '/gp/css/homepage')]"),
-                driver.find_elements(By.XPATH, "//span[contains(text(), 'Account & Lists')]"),
-                driver.find_elements(By.XPATH, "//a[contains(@href, '/gp/css/order-history')]")
-            ]
-
-            for elements in positive_indicators:
-                if elements:
-                    for element in elements:
-                        text = element.text.strip()
-                        if text and text.lower() != "hello, sign in":
-                            self.logger.info(f"Session valid - found logged-in indicator: '{text}'")
-                            return True
+            # Check for positive indicators that we ARE logged in (one query for all)
+            for element in driver.find_elements(By.XPATH, LOGGED_IN_INDICATOR_XPATH):
+                text = element.text.strip()
+                if text and text.lower() != "hello, sign in":
+                    self.logger.info(f"Session valid - found logged-in indicator: '{text}'")
+                    return True
 
             # Check for explicit sign-in prompts
-            sign_in_indicators = [
-                "Hello, sign in",
-                "Sign in",
-                "Sign in to your account"
-            ]
-
-            page_source = driver.page_source.lower()
-            for indicator in sign_in_indicators:
-                if indicator.lower() in page_source:
-                    self.logger.warning(f"Session expired - found sign-in prompt: '{indicator}'")
-                    return False
+            sign_in = SIGN_IN_RE.search(page_source_lower)
+            if sign_in:
+                self.logger.warning(f"Session expired - found sign-in prompt: '{sign_in.group()}'")
+                return False
 
             self.logger.warning("Session validity unclear, assuming logged out")
             return False
@@ -104,8 +137,14 @@ class AmazonAuth:
     def _navigate_to_login(self, driver):
         """Navigate to the Amazon sign-in page."""
         self.logger.info("Navigating to Amazon homepage...")
-        driver.get("https://www.amazon.com")
-        time.sleep(2)
+        driver.get(self.config.storefront)
+        try:
+            self._wait(driver, 5).until(EC.any_of(
+                EC.presence_of_element_located((By.ID, "nav-link-accountList")),
+                EC.presence_of_element_located((By.ID, "ap_email"))
+            ))
+        except TimeoutException:
+            self.logger.debug("Homepage header not ready, searching for sign-in link anyway")
 
         # Find and click a sign-in link
         selectors = [
@@ -119,9 +158,7 @@ class AmazonAuth:
             self._click_element(driver, sign_in_element)
         else:
             self.logger.info("Sign-in link not found, navigating directly")
-            driver.get("https://www.amazon.com/gp/sign-in.html")
-
-        time.sleep(2)
+            driver.get(f"{self.config.storefront}/gp/sign-in.html")
 
     def _enter_credentials(self, driver):
         """Enter email and password credentials."""
@@ -139,121 +176,109 @@ class AmazonAuth:
                 password_field = self._find_password_field(driver)
                 password_field.clear()
                 password_field.send_keys(password)
+
+                # Step 4: Submit login
                 self._click_signin_button(driver)
 
             # Use secure password handling
-            secure_password = self.password_manager.decrypt_password(self.config.password_encrypted)
-            secure_password.use_secret(fill_password)
-
-
-            # Step 4: Submit login
-            self._click_signin_button(driver)
+            self._get_secure_password().use_secret(fill_password)
 
         except Exception as e:
             self.logger.error(f"Login failed: {e}")
             raise
 
+    def _get_secure_password(self):
+        """Decrypt the configured password once and reuse it for later logins."""
+        if self._secure_password_source != self.config.password_encrypted:
+            self._secure_password = self.password_manager.decrypt_password(
+                self.config.password_encrypted
+            )
+            self._secure_password_source = self.config.password_encrypted
+        return self._secure_password
+
     def _find_email_field(self, driver):
-        """Find the email field using fast detection."""
+        """Find the email field with a single wait over all known selectors."""
         self.logger.info("Looking for email field...")
 
-        # Try quick selectors first (2 seconds each)
-        quick_selectors = [
-            (By.ID, "ap_email"),
-            (By.CSS_SELECTOR, "input[type='email']"),
-            (By.CSS_SELECTOR, "input[type='text']:not([type='hidden'])")
-        ]
-
-        field = self._try_selectors(driver, quick_selectors, timeout=2)
-        if field:
-            return field
-
-        # Fallback to comprehensive search
-        self.logger.debug("Quick search failed, trying comprehensive search...")
-        comprehensive_selectors = [
-            (By.NAME, "email"),
-            (By.XPATH, "//input[contains(@placeholder, 'email') or contains(@placeholder, 'mobile')]"),
-            (By.CSS_SELECTOR, "input[autocomplete*='email']")
-        ]
-
-        field = self._try_selectors(driver, comprehensive_selectors, timeout=3)
+        field = self._try_selectors(driver, EMAIL_FIELD_XPATHS, timeout=5)
         if field:
             return field
 
         raise ElementNotFoundError("Email field not found")
 
-    @staticmethod
-    def _find_password_field(driver):
-        """Find the password field."""
-        return WebDriverWait(driver, 5).until(
-            EC.element_to_be_clickable((By.ID, "ap_password"))
+    def _wait(self, driver, timeout, **kwargs) -> WebDriverWait:
+        """Create a WebDriverWait polling at the configured interval."""
+        return WebDriverWait(
+            driver, timeout, poll_frequency=self.config.wait_poll_interval, **kwargs
         )
 
-    @staticmethod
-    def _click_continue_button(driver):
-        """Click the Continue button."""
-        continue_button = WebDriverWait(driver, 3).until(
-            EC.element_to_be_clickable((By.ID, "continue"))
+    def _wait_clickable(self, driver, by, selector, timeout=3):
+        """Wait until an element is clickable and return it."""
+        return self._wait(driver, timeout).until(
+            EC.element_to_be_clickable((by, selector))
         )
+
+    def _wait_for_page_load(self, driver, timeout=5):
+        """Wait for the document to finish loading, without failing on timeout."""
+        try:
+            self._wait(driver, timeout).until(
+                lambda d: d.execute_script("return document.readyState") == "complete"
+            )
+        except TimeoutException:
+            pass
+
+    def _find_password_field(self, driver):
+        """Wait for the password field shown after Continue to become clickable."""
+        return self._wait_clickable(driver, By.ID, "ap_password", timeout=5)
+
+    def _click_continue_button(self, driver):
+        """Click the Continue button; _find_password_field waits for the next step."""
+        continue_button = self._wait_clickable(driver, By.ID, "continue")
         continue_button.click()
-        time.sleep(2)
 
     def _click_signin_button(self, driver):
         self.logger.info("Looking for sign-in button...")
 
-        # More comprehensive selectors for the sign-in button
-        selectors = [
-            (By.ID, "signInSubmit"),
-            (By.NAME, "signInSubmit"),
-            (By.CSS_SELECTOR, "[type='submit']"),
-            (By.XPATH, "//input[@type='submit']"),
-            (By.XPATH, "//span[contains(text(), 'Sign-In')]"),
-            (By.XPATH, "//input[contains(@value, 'Sign-In')]"),
-            (By.XPATH, "//button[contains(text(), 'Sign-In')]")
-        ]
-
-        # Try each selector
-        for by, selector in selectors:
-            try:
-                self.logger.debug(f"Trying selector: {by}={selector}")
-                button = WebDriverWait(driver, 3).until(
-                    EC.element_to_be_clickable((by, selector))
-                )
-                self.logger.info(f"Found sign-in button using: {by}={selector}")
-                button.click()
-                return True
-            except TimeoutException:
-                continue
-            except Exception as e:
-                self.logger.debug(f"Error with selector {selector}: {str(e)}")
-                continue
+        button = self._try_selectors(driver, SIGN_IN_BUTTON_XPATHS, timeout=5)
+        if button:
+            button.click()
+            return True
 
         # If we get here, log the page content for debugging
         self.logger.error("Could not find sign-in button. Current page content:")
         self._debug_available_fields(driver)
         raise ElementNotFoundError("Sign-in button not found")
 
-    def _try_selectors(self, driver, selectors, timeout=3):
-        """Try multiple selectors and return the first match."""
-        for by, selector in selectors:
-            try:
-                field = WebDriverWait(driver, timeout).until(
-                    EC.element_to_be_clickable((by, selector))
-                )
-                self.logger.info(f"Found field: {selector}")
-                return field
-            except TimeoutException:
-                continue
-        return None
+    def _try_selectors(self, driver, xpaths, timeout=3):
+        """
+        Wait for the first clickable element matching XPath selectors in priority order.
+
+        All selectors are evaluated by one script call per poll, so a missing
+        selector does not cost its own timeout, and an earlier selector wins
+        over a later one wherever their matches sit in the document.
+        """
+        def first_clickable(d):
+            for matches in d.execute_script(XPATH_MATCHES_SCRIPT, xpaths):
+                for element in matches:
+                    if element.is_displayed() and element.is_enabled():
+                        return element
+            return False
+
+        try:
+            element = self._wait(
+                driver, timeout, ignored_exceptions=(StaleElementReferenceException,)
+            ).until(first_clickable)
+            self.logger.info("Found clickable element")
+            return element
+        except TimeoutException:
+            return None
 
     def _find_field(self, driver, selectors, field_name, timeout=10):
         """Find a field using multiple selectors."""
         for by, selector in selectors:
             try:
                 self.logger.debug(f"Trying {field_name} selector: {by}={selector}")
-                field = WebDriverWait(driver, timeout).until(
-                    EC.element_to_be_clickable((by, selector))
-                )
+                field = self._wait_clickable(driver, by, selector, timeout)
                 self.logger.info(f"Found {field_name} using: {by}={selector}")
                 return field
             except TimeoutException:
@@ -266,46 +291,39 @@ class AmazonAuth:
 
     def _debug_available_fields(self, driver):
         """Debug helper to show all available input fields."""
+        script = """
+            return Array.from(document.querySelectorAll("input:not([type='hidden']), button"))
+                .slice(0, 10)
+                .map(e => ({
+                    tag: e.tagName.toLowerCase(),
+                    type: e.type || 'text',
+                    id: e.id || 'no-id',
+                    name: e.name || 'no-name',
+                    value: e.value || 'no-value',
+                    text: e.innerText || 'no-text'
+                }));
+        """
         try:
-            all_inputs = driver.find_elements(By.CSS_SELECTOR, "input:not([type='hidden']), button")
-            for i, inp in enumerate(all_inputs[:10]):  # Show first 10
-                try:
-                    tag = inp.tag_name
-                    inp_type = inp.get_attribute("type") or "text"
-                    inp_id = inp.get_attribute("id") or "no-id"
-                    inp_name = inp.get_attribute("name") or "no-name"
-                    inp_value = inp.get_attribute("value") or "no-value"
-                    inp_text = inp.text or "no-text"
-                    self.logger.error(f"  {tag} {i}: type={inp_type}, id={inp_id}, name={inp_name}, value={inp_value}, text={inp_text}")
-                except (StaleElementReferenceException, WebDriverException) as e:
-                    self.logger.debug(f"Could not get attributes for element {i}: {e}")
-        except (NoSuchElementException, WebDriverException) as e:
+            fields = driver.execute_script(script) or []
+            for i, field in enumerate(fields):
+                self.logger.error(
+                    f"  {field['tag']} {i}: type={field['type']}, id={field['id']}, "
+                    f"name={field['name']}, value={field['value']}, text={field['text']}"
+                )
+        except (WebDriverException, TypeError, KeyError) as e:
             self.logger.debug(f"Failed to get input fields: {e}")
 
     def _handle_security_checks(self, driver):
         """Handle CAPTCHA and other security verification."""
-        time.sleep(5)  # Give page time to load
+        self._wait_for_page_load(driver)
         page_source_lower = driver.page_source.lower()
 
-        captcha_indicators = [
-            "captcha",
-            "enter the characters you see below",
-            "enter the characters you see above",
-            "type the characters you see in this image",
-            "bot check",
-            "sorry, we just need to make sure you're not a robot",
-            "verify your identity",
-            "enter the text you see above",
-            "unusual activity"
-        ]
-
-        if any(indicator in page_source_lower for indicator in captcha_indicators):
+        if CAPTCHA_RE.search(page_source_lower):
             self.logger.warning("CAPTCHA detected!")
             print("\n🤖 CAPTCHA detected - solve it in the browser window")
             input("Press Enter when done... ")
 
-        if ("additional security verification" in page_source_lower or
-                "we need to verify your identity" in page_source_lower):
+        if SECURITY_VERIFICATION_RE.search(page_source_lower):
             self.logger.warning("Security verification required!")
             print("\n🔐 Security verification required - complete it in the browser")
             input("Press Enter when done... ")
@@ -313,14 +331,19 @@ class AmazonAuth:
     def _verify_login(self, driver) -> bool:
         """Verify that login was successful."""
         try:
-            WebDriverWait(driver, 15).until(
+            self._wait(driver, 15).until(
                 EC.presence_of_element_located((By.ID, "nav-link-accountList"))
             )
             self.logger.info("Successfully logged in to Amazon")
 
-            # Visit account page to strengthen session
-            driver.get("https://www.amazon.com/gp/css/homepage.html")
-            time.sleep(2)
+            # Touch the account page to strengthen the session, without a full page load
+            try:
+                driver.execute_script(
+                    "return fetch('/gp/css/homepage.html', {credentials: 'include'})"
+                    ".then(r => r.status);"
+                )
+            except WebDriverException as e:
+                self.logger.debug(f"Account page request failed: {e}")
             return True
 
         except TimeoutException:
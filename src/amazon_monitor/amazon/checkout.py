@@ -1,8 +1,16 @@
-"""Amazon checkout and purchase handling."""
+"""
+Amazon checkout and purchase handling.
+
+Assumes the driver's implicit wait is 0 (see BrowserManager); anything that
+needs to poll uses an explicit WebDriverWait.
+"""
 
 import logging
-import time
+import re
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 
+from selenium import webdriver
 from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
@@ -10,6 +18,37 @@ from selenium.webdriver.support.ui import WebDriverWait
 
 from ..config.settings import Config
 
+ORDER_SUCCESS_RE = re.compile(r"order placed|thank you|order confirmation|your order")
+CART_PAGE_RE = re.compile(r"proceed-to-checkout|shopping cart")
+
+# Purchase buttons in the buying options modal, in priority order
+PURCHASE_BUTTON_XPATHS = (
+    "//input[contains(@name, 'submit.preOrder')]",
+    "//span[contains(text(), 'Pre-order')]",
+    "//input[contains(@name, 'submit.addToCart')]",
+    "//span[contains(text(), 'Add to Cart')]",
+    "//input[contains(@value, 'Buy now')]"
+)
+# Cart page buttons, buy-box ids before text matches
+PROCEED_TO_CHECKOUT_XPATHS = (
+    "//*[@id='sc-buy-box-ptc-button']",
+    "//input[@name='proceedToRetailCheckout']",
+    "//span[contains(text(), 'Proceed to checkout')]",
+    "//a[contains(text(), 'Proceed to checkout')]"
+)
+
+# Evaluates every XPath in one round-trip and returns each one's matches, in the
+# order given. A union query would return document order and lose the priority.
+XPATH_MATCHES_SCRIPT = """
+    return arguments[0].map(xpath => {
+        const result = document.evaluate(
+            xpath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null
+        );
+        return Array.from({length: result.snapshotLength}, (_, i) => result.snapshotItem(i));
+    });
+"""
+ORDER_CONFIRMATION_XPATH = "//*[contains(text(),'order placed') or contains(text(),'Thank you')]"
+
 
 class CheckoutHandler:
     """Handles Amazon checkout and purchase process."""
@@ -17,6 +56,7 @@ class CheckoutHandler:
     def __init__(self, config: Config):
         self.config = config
         self.logger = logging.getLogger(__name__)
+        self._screenshot_executor = ThreadPoolExecutor(max_workers=1)
 
     def attempt_purchase(self, driver, button, button_type: str) -> bool:
         """
@@ -87,7 +127,7 @@ class CheckoutHandler:
     def _handle_direct_purchase_flow(self, driver, button) -> bool:
         """Handle direct purchase button click."""
         try:
-            button_id = self._get_element_identifier(button)
+            button_id = self._get_element_identifier(driver, button)
 
             self._scroll_to_element(driver, button)
             self._click_element(driver, button)
@@ -126,10 +166,10 @@ class CheckoutHandler:
 
             # Final confirmation before placing order
             self.logger.info("Direct checkout available - placing order")
-            place_order_button.click()
+            self._click_place_order(driver, place_order_button)
 
-            # Wait a moment and verify success
-            time.sleep(3)
+            # Wait for the confirmation page and verify success
+            self._wait_for_order_confirmation(driver)
             self._take_screenshot(driver, "order_confirmation.png")
 
             if self._verify_order_success(driver):
@@ -172,10 +212,10 @@ class CheckoutHandler:
             )
 
             self._take_screenshot(driver, "cart_checkout_page.png")
-            place_order_button.click()
+            self._click_place_order(driver, place_order_button)
 
             # Verify order success
-            time.sleep(3)
+            self._wait_for_order_confirmation(driver)
             self._take_screenshot(driver, "cart_order_confirmation.png")
 
             if self._verify_order_success(driver):
@@ -194,72 +234,69 @@ class CheckoutHandler:
             return False
 
     def _find_purchase_buttons_in_modal(self, driver):
-        """Find purchase buttons in the buying options modal."""
-        selectors = [
-            "//input[contains(@name, 'submit.preOrder')]",
-            "//span[contains(text(), 'Pre-order')]",
-            "//input[contains(@name, 'submit.addToCart')]",
-            "//span[contains(text(), 'Add to Cart')]",
-            "//input[contains(@value, 'Buy now')]"
-        ]
-
-        for selector in selectors:
-            try:
-                elements = driver.find_elements(By.XPATH, selector)
-                if elements:
-                    return elements
-            except Exception:
-                continue
-
-        return []
+        """Find purchase buttons in the buying options modal, from the highest-priority selector that matches."""
+        try:
+            return self._first_xpath_matches(driver, PURCHASE_BUTTON_XPATHS)
+        except Exception as e:
+            self.logger.warning(f"Error finding purchase buttons: {e}")
+            return []
 
     def _find_proceed_to_checkout_button(self, driver):
-        """Find the proceed to checkout button."""
-        selectors = [
-            (By.ID, "sc-buy-box-ptc-button"),
-            (By.XPATH, "//input[@name='proceedToRetailCheckout']"),
-            (By.XPATH, "//span[contains(text(), 'Proceed to checkout')]"),
-            (By.XPATH, "//a[contains(text(), 'Proceed to checkout')]")
-        ]
-
-        for by, selector in selectors:
-            try:
-                elements = driver.find_elements(by, selector)
-                if elements:
-                    return elements[0]
-            except Exception:
-                continue
+        """Find the proceed to checkout button, preferring the buy-box ids over text matches."""
+        try:
+            elements = self._first_xpath_matches(driver, PROCEED_TO_CHECKOUT_XPATHS)
+            if elements:
+                return elements[0]
+        except Exception as e:
+            self.logger.warning(f"Error finding proceed to checkout button: {e}")
 
         return None
 
+    @staticmethod
+    def _first_xpath_matches(driver, xpaths) -> list:
+        """Matches of the first XPath (in priority order) that finds anything, in one round-trip."""
+        for matches in driver.execute_script(XPATH_MATCHES_SCRIPT, xpaths):
+            if matches:
+                return matches
+        return []
+
     def _is_in_cart_flow(self, driver) -> bool:
         """Check if we're in the cart/checkout flow."""
-        indicators = [
-            "cart" in driver.current_url,
-            "proceed-to-checkout" in driver.page_source.lower(),
-            "shopping cart" in driver.page_source.lower(),
-            "checkout" in driver.current_url
-        ]
+        # The URL is cheap to fetch; only pull the page source when it isn't conclusive
+        url = driver.current_url
+        if "cart" in url or "checkout" in url:
+            return True
+
+        page_source_lower = driver.page_source.lower()
+        return bool(CART_PAGE_RE.search(page_source_lower))
 
-        return any(indicators)
+    def _wait_for_order_confirmation(self, driver, timeout: int = 10):
+        """Wait for the order confirmation page, leaving verification to the caller."""
+        try:
+            WebDriverWait(driver, timeout).until(EC.any_of(
+                EC.url_contains("/thankyou"),
+                EC.presence_of_element_located((By.XPATH, ORDER_CONFIRMATION_XPATH))
+            ))
+        except TimeoutException:
+            self.logger.debug("Order confirmation page not detected within timeout")
 
     def _verify_order_success(self, driver) -> bool:
         """Verify that the order was placed successfully."""
-        success_indicators = [
-            "order placed" in driver.page_source.lower(),
-            "thank you" in driver.page_source.lower(),
-            "order confirmation" in driver.page_source.lower(),
-            "your order" in driver.page_source.lower(),
-            "/gp/css/order-history" in driver.current_url
-        ]
+        if "/gp/css/order-history" in driver.current_url:
+            return True
 
-        return any(success_indicators)
+        page_source_lower = driver.page_source.lower()
+        return bool(ORDER_SUCCESS_RE.search(page_source_lower))
 
     def _scroll_to_element(self, driver, element):
-        """Scroll element into view."""
+        """
+        Scroll element to the middle of the viewport.
+
+        Scrolling runs synchronously in the page, so no wait is needed before
+        clicking. Centering keeps the element clear of Amazon's sticky header.
+        """
         try:
-            driver.execute_script("arguments[0].scrollIntoView(true);", element)
-            time.sleep(1)
+            driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
         except Exception as e:
             self.logger.warning(f"Error scrolling to element: {e}")
 
@@ -276,25 +313,80 @@ class CheckoutHandler:
                 self.logger.error(f"Failed to click element: {e}")
                 raise
 
-    def _get_element_identifier(self, element) -> str:
+    def _click_place_order(self, driver, button):
+        """
+        Click the place-order button via CDP mouse events on Chrome.
+
+        Dispatching the press/release directly through DevTools skips the
+        WebDriver actionability checks on the most time-sensitive click, so
+        the script first checks that nothing (an overlay, the sticky header)
+        covers the button's center. Falls back to a regular click on other
+        drivers, when the button is covered, or if CDP fails.
+        """
+        if isinstance(driver, webdriver.Chrome):
+            try:
+                center = driver.execute_script(
+                    "arguments[0].scrollIntoView({block: 'center'});"
+                    "const r = arguments[0].getBoundingClientRect();"
+                    "const x = r.left + r.width / 2, y = r.top + r.height / 2;"
+                    "const hit = document.elementFromPoint(x, y);"
+                    "return {x: x, y: y, hit: hit !== null && arguments[0].contains(hit)};",
+                    button
+                )
+                if center["hit"]:
+                    for event_type in ("mousePressed", "mouseReleased"):
+                        driver.execute_cdp_cmd("Input.dispatchMouseEvent", {
+                            "type": event_type,
+                            "x": center["x"],
+                            "y": center["y"],
+                            "button": "left",
+                            "clickCount": 1
+                        })
+                    return
+                self.logger.warning("Place-order button is covered, falling back to WebDriver click")
+            except Exception as e:
+                self.logger.warning(f"CDP click failed, falling back to WebDriver click: {e}")
+
+        button.click()
+
+    def _get_element_identifier(self, driver, element) -> str:
         """Get a useful identifier for an element for logging."""
         try:
-            element_id = element.get_attribute("id")
-            if element_id:
-                return f"ID: {element_id}"
+            info = driver.execute_script(
+                "return {id: arguments[0].id, cls: arguments[0].className};", element
+            )
+            if info.get("id"):
+                return f"ID: {info['id']}"
 
-            element_class = element.get_attribute("class")
-            if element_class:
-                return f"Class: {element_class}"
+            if info.get("cls"):
+                return f"Class: {info['cls']}"
 
             return "Unknown element"
         except Exception:
             return "Element identifier unavailable"
 
     def _take_screenshot(self, driver, filename: str):
-        """Take a screenshot for debugging."""
+        """
+        Take a screenshot for debugging, if enabled.
+
+        The image is captured immediately, but written to disk on a background
+        thread so the checkout flow does not wait on the file write.
+        """
+        if not self.config.debug_screenshots:
+            return
+
+        try:
+            png = driver.get_screenshot_as_png()
+        except Exception as e:
+            self.logger.warning(f"Failed to capture screenshot {filename}: {e}")
+            return
+
+        self._screenshot_executor.submit(self._write_screenshot, filename, png)
+
+    def _write_screenshot(self, filename: str, png: bytes):
+        """Write captured screenshot bytes to disk."""
         try:
-            driver.save_screenshot(filename)
+            Path(filename).write_bytes(png)
             self.logger.info(f"Screenshot saved: {filename}")
         except Exception as e:
             self.logger.warning(f"Failed to save screenshot {filename}: {e}")
\ No newline at end of file
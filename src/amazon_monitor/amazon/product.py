@@ -2,15 +2,123 @@
 
 import logging
 import random
+import re
 import time
+from functools import lru_cache
 from typing import Tuple, Optional, Any
-
+from urllib.parse import quote_plus
+
+from selenium.common.exceptions import (
+    JavascriptException,
+    NoSuchElementException,
+    StaleElementReferenceException,
+    TimeoutException,
+    WebDriverException
+)
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+from urllib3.exceptions import MaxRetryError, ProtocolError
 
 from ..config.settings import Config
 from ..exceptions import ElementClickError
 
+# Availability probes as (By, selector) pairs, in priority order. CSS is used
+# wherever an id or attribute identifies the element; XPath only remains for
+# visible-text matches. The same pairs run in-browser (_PROBE_SCRIPT) or one by
+# one through find_elements.
+_DIRECT_SELECTORS = (
+    (By.CSS_SELECTOR, "#preorder-button"),
+    (By.CSS_SELECTOR, "#submit\\.preorder"),
+    (By.CSS_SELECTOR, "#submit\\.preorder-now"),
+    (By.CSS_SELECTOR, "#buy-now-button"),
+    (By.CSS_SELECTOR, "#add-to-cart-button"),
+    (By.CSS_SELECTOR, "input[value*='Pre-order' i]"),
+    (By.XPATH, "//span[contains(text(), 'Pre-order')]"),
+    (By.XPATH, "//a[contains(text(), 'Pre-order')]")
+)
+_BUYING_OPTION_SELECTORS = (
+    (By.CSS_SELECTOR, "#buybox-see-all-buying-choices, #buybox-see-all-buying-choices-announce"),
+    (By.XPATH, "//span[contains(text(), 'See All Buying Options')]"),
+    (By.XPATH, "//a[contains(text(), 'See All Buying Options')]")
+)
+_UNAVAILABLE_TEXTS = (
+    "Currently unavailable",
+    "Out of Stock",
+    "Sign up to be notified when this item becomes available",
+    "Temporarily out of stock"
+)
+# One alternation, so the page text is scanned once rather than once per phrase.
+# re.escape only escapes characters that are special in JS regexes too.
+_UNAVAILABLE_PATTERN = "|".join(re.escape(text) for text in _UNAVAILABLE_TEXTS)
+
+
+# WebDriver errors caused by the page rather than the browser; any other
+# WebDriver error ("chrome not reachable", lost session or window) means the
+# browser is gone, as do the urllib3 errors raised when chromedriver has died
+_PAGE_ERRORS = (
+    JavascriptException, NoSuchElementException, StaleElementReferenceException, TimeoutException
+)
+DRIVER_CONNECTION_ERRORS = (MaxRetryError, ProtocolError)
+
+
+def is_browser_error(error: BaseException) -> bool:
+    """Whether an error means the browser or chromedriver is gone, rather than a page problem."""
+    if isinstance(error, DRIVER_CONNECTION_ERRORS):
+        return True
+    return isinstance(error, WebDriverException) and not isinstance(error, _PAGE_ERRORS)
+
+
+# Hyphenated product slug in "/<slug>/dp/<asin>" (optionally after one more segment)
+_SLUG_RE = re.compile(r"amazon\.[a-z.]+/(?:[^/]+/)?([\w]+-[\w-]+)/(?:dp|gp)/", re.IGNORECASE)
+
+
+@lru_cache(maxsize=8)
+def _search_term_from_url(product_url: str) -> str:
+    """Extract a searchable product name from a product URL (cached per URL)."""
+    match = _SLUG_RE.search(product_url)
+    return match.group(1).replace('-', ' ') if match else "new products"
+
+
+# Returns the first unavailability text present on the page, or null
+_UNAVAILABLE_SCRIPT = """
+    const text = document.body ? document.body.innerText : '';
+    const match = text.match(new RegExp(arguments[0]));
+    return match ? match[0] : null;
+"""
+
+# Runs every availability probe in one round-trip and reports the first hit.
+# Unavailability is checked first: it is the common answer while polling, so the
+# direct buy-box selectors are skipped entirely. The early exit is only taken when
+# no buying-options element exists (Amazon shows #outOfStock for its own stock
+# while other sellers may still offer the item), and only the buy box's own
+# availability block is scanned, so the same phrases elsewhere on the page
+# (carousels, reviews) cannot hide a pre-order button.
+_PROBE_SCRIPT = """
+    const [direct, buyingOptions, unavailable] = arguments;
+    const exists = ([by, selector]) => by === 'xpath'
+        ? document.evaluate(
+            selector, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null
+          ).singleNodeValue !== null
+        : document.querySelector(selector) !== null;
+    if (!buyingOptions.some(exists)) {
+        if (document.getElementById('outOfStock')) {
+            return {kind: 'unavailable', phrase: '#outOfStock'};
+        }
+        const availability = document.getElementById('availability');
+        const match = availability ? availability.innerText.match(new RegExp(unavailable)) : null;
+        if (match) return {kind: 'unavailable', phrase: match[0]};
+    }
+    for (const [by, selector] of direct) {
+        if (exists([by, selector])) return {kind: 'direct', by: by, selector: selector};
+    }
+    for (const [by, selector] of buyingOptions) {
+        if (exists([by, selector])) return {kind: 'buying_options', by: by, selector: selector};
+    }
+    return {kind: 'none'};
+"""
+
 
 class ProductChecker:
     """Handles product availability checking and page interactions."""
@@ -37,6 +145,11 @@ class ProductChecker:
             self._navigate_to_product(driver)
             self.simulate_human_browsing(driver)
 
+            probe = self._probe_page(driver)
+            if probe is not None:
+                return self._resolve_probe(driver, probe)
+
+            # Probe unavailable - check each selector group in turn
             # Check for direct pre-order buttons first
             available, button, button_type = self._check_direct_preorder_buttons(driver)
             if available:
@@ -55,11 +168,58 @@ class ProductChecker:
             return False, None, None
 
         except Exception as e:
+            if is_browser_error(e):
+                # The browser itself is gone; let the monitor replace it
+                raise
             self.logger.error(f"Error checking product availability: {e}")
             return False, None, None
 
+    def _probe_page(self, driver) -> Optional[dict]:
+        """
+        Run all availability probes in the browser with a single script call.
+
+        Returns:
+            dict describing the first hit ({"kind": ..., ...}), or None if the
+            probe could not be run and selectors should be checked one by one
+        """
+        try:
+            probe = driver.execute_script(
+                _PROBE_SCRIPT, _DIRECT_SELECTORS, _BUYING_OPTION_SELECTORS, _UNAVAILABLE_PATTERN
+            )
+        except Exception as e:
+            if is_browser_error(e):
+                raise
+            self.logger.warning(f"Availability probe failed: {e}")
+            return None
+
+        if not isinstance(probe, dict) or "kind" not in probe:
+            return None
+        return probe
+
+    def _resolve_probe(self, driver, probe: dict) -> Tuple[bool, Optional[Any], Optional[str]]:
+        """Turn a probe result into (available, button_element, button_type)."""
+        kind = probe["kind"]
+
+        if kind in ("direct", "buying_options"):
+            self.logger.info(f"{kind} button found: {probe['selector']}")
+            return True, driver.find_element(probe["by"], probe["selector"]), kind
+
+        if kind == "unavailable":
+            self.logger.info(f"Product unavailable: '{probe['phrase']}' found on page")
+        else:
+            self.logger.warning("Product availability status unclear, assuming unavailable")
+        return False, None, None
+
+    @property
+    def human_simulation_enabled(self) -> bool:
+        """Whether anti-detection browsing behaviour should be simulated."""
+        return self.config.enable_anti_detection or self.config.stealth_mode
+
     def simulate_human_browsing(self, driver):
-        """Simulate human-like browsing behavior on the product page."""
+        """Simulate human-like browsing behavior on the product page (anti-detection only)."""
+        if not self.human_simulation_enabled:
+            return
+
         self._simulate_referrer_visit(driver)
         self._scroll_page(driver)
         self._check_images(driver)
@@ -67,15 +227,31 @@ class ProductChecker:
 
     def _navigate_to_product(self, driver):
         """Navigate to the actual product page."""
-        self.logger.info(f"Navigating to product page: {self.config.product_url}")
-        driver.get(self.config.product_url)
-        time.sleep(self._random_delay(2, 4))
+        # Still on the product page from the last poll: reload it and let the
+        # browser cache serve the static assets instead of a fresh navigation
+        if driver.current_url == self.config.product_url:
+            self.logger.info("Reloading product page")
+            driver.refresh()
+        else:
+            self.logger.info(f"Navigating to product page: {self.config.product_url}")
+            driver.get(self.config.product_url)
+
+        # With an eager/none page load strategy, get() can return before the buy box exists
+        try:
+            self._wait(driver, 15).until(EC.any_of(
+                EC.presence_of_element_located((By.ID, "add-to-cart-button")),
+                EC.presence_of_element_located((By.ID, "buybox-see-all-buying-choices")),
+                EC.presence_of_element_located((By.ID, "availability"))
+            ))
+        except TimeoutException:
+            self.logger.debug("Buy box not found within timeout, checking page anyway")
 
     def _simulate_referrer_visit(self, driver):
         """Simulate visiting a referrer page before going to product."""
+        storefront = self.config.storefront
         referrers = [
-            "https://www.amazon.com",
-            "https://www.amazon.com/gp/bestsellers",
+            storefront,
+            f"{storefront}/gp/bestsellers",
             "https://www.google.com/search?q=amazon+products",
             None  # Sometimes come directly
         ]
@@ -86,10 +262,10 @@ class ProductChecker:
 
         self.logger.info(f"Visiting referrer page: {referrer}")
         driver.get(referrer)
-        time.sleep(self._random_delay(1, 3))
+        self._pause(1, 3)
 
         # Sometimes simulate a search
-        if "amazon.com" in referrer and random.random() < 0.3:
+        if referrer.startswith(storefront) and random.random() < 0.3:
             self._simulate_product_search(driver)
 
     def _simulate_product_search(self, driver):
@@ -105,37 +281,40 @@ class ProductChecker:
 
     def _extract_product_name_from_url(self) -> str:
         """Extract a searchable product name from the URL."""
-        product_parts = self.config.product_url.split('/')
-        for part in product_parts:
-            if len(part) > 5 and '-' in part:
-                return part.replace('-', ' ')
-        return "new products"
+        return _search_term_from_url(self.config.product_url)
 
     def _perform_search(self, driver, search_term: str):
-        """Perform a search using the search box."""
+        """Perform a search, typing into the search box only in stealth mode."""
         try:
+            if not self.config.stealth_mode:
+                # Same results page without the keystrokes
+                driver.get(f"{self.config.storefront}/s?k={quote_plus(search_term)}")
+                self._wait_for_search_results(driver)
+                return
+
             search_box = driver.find_element(By.ID, "twotabsearchtextbox")
             search_box.clear()
-            self._humanlike_typing(driver, search_box, search_term)
+            self._humanlike_typing(search_box, search_term)
             search_box.send_keys(Keys.ENTER)
-            time.sleep(self._random_delay(2, 4))
+            self._wait_for_search_results(driver)
         except Exception as e:
             self.logger.warning(f"Error performing search: {e}")
 
     def _click_random_search_result(self, driver):
         """Click on a random search result and navigate back."""
         try:
-            results = driver.find_elements(By.XPATH, "//a[contains(@class, 's-result-item')]")
+            results = driver.find_elements(By.CSS_SELECTOR, "a[class*='s-result-item']")
             if not results:
                 return
 
             max_results = min(5, len(results))
             random_result = random.choice(results[:max_results])
             self._humanlike_click(driver, random_result)
-            time.sleep(self._random_delay(2, 4))
+            self._wait_for_page_load(driver)
+            self._pause(2, 4)
 
             driver.back()
-            time.sleep(self._random_delay(1, 3))
+            self._wait_for_search_results(driver)
         except Exception as e:
             self.logger.warning(f"Error clicking search result: {e}")
 
@@ -145,13 +324,13 @@ class ProductChecker:
             # Initial scroll
             scroll_height = random.randint(300, 800)
             driver.execute_script(f"window.scrollBy(0, {scroll_height})")
-            time.sleep(self._random_delay(1, 3))
+            self._pause(1, 3)
 
             # Maybe scroll more
             if random.random() < 0.5:
                 additional_scroll = random.randint(500, 1200)
                 driver.execute_script(f"window.scrollBy(0, {additional_scroll})")
-                time.sleep(self._random_delay(1, 2))
+                self._pause(1, 2)
         except Exception as e:
             self.logger.warning(f"Error during scrolling: {e}")
 
@@ -166,7 +345,7 @@ class ProductChecker:
                 return
 
             self._humanlike_click(driver, image_elements[0])
-            time.sleep(self._random_delay(1, 3))
+            self._pause(1, 3)
             self._close_image_modal_if_opened(driver)
         except Exception as e:
             self.logger.warning(f"Error checking images: {e}")
@@ -175,16 +354,16 @@ class ProductChecker:
         """Find product image elements on the page."""
         image_elements = driver.find_elements(By.ID, "landingImage")
         if not image_elements:
-            image_elements = driver.find_elements(By.XPATH, "//img[contains(@id, 'image')]")
+            image_elements = driver.find_elements(By.CSS_SELECTOR, "img[id*='image']")
         return image_elements
 
     def _close_image_modal_if_opened(self, driver):
         """Close image modal if it was opened."""
         try:
-            close_buttons = driver.find_elements(By.XPATH, "//button[contains(@aria-label, 'Close')]")
+            close_buttons = driver.find_elements(By.CSS_SELECTOR, "button[aria-label*='Close']")
             if close_buttons:
                 self._humanlike_click(driver, close_buttons[0])
-                time.sleep(self._random_delay(0.5, 1))
+                self._pause(0.5, 1)
         except Exception:
             pass
 
@@ -192,24 +371,13 @@ class ProductChecker:
         """Scroll back to the buy box area."""
         try:
             driver.execute_script("window.scrollTo(0, 0)")
-            time.sleep(self._random_delay(1, 2))
+            self._pause(1, 2)
         except Exception as e:
             self.logger.warning(f"Error scrolling to top: {e}")
 
     def _check_direct_preorder_buttons(self, driver) -> Tuple[bool, Optional[Any], Optional[str]]:
         """Check for direct pre-order buttons."""
-        selectors = [
-            (By.ID, "preorder-button"),
-            (By.ID, "submit.preorder"),
-            (By.ID, "submit.preorder-now"),
-            (By.ID, "buy-now-button"),
-            (By.ID, "add-to-cart-button"),
-            (By.XPATH, "//input[contains(@value, 'Pre-order')]"),
-            (By.XPATH, "//span[contains(text(), 'Pre-order')]"),
-            (By.XPATH, "//a[contains(text(), 'Pre-order')]")
-        ]
-
-        for selector_type, selector in selectors:
+        for selector_type, selector in _DIRECT_SELECTORS:
             try:
                 elements = driver.find_elements(selector_type, selector)
                 if elements:
@@ -222,14 +390,7 @@ class ProductChecker:
 
     def _check_buying_options_buttons(self, driver) -> Tuple[bool, Optional[Any], Optional[str]]:
         """Check for 'See all buying options' buttons."""
-        selectors = [
-            (By.ID, "buybox-see-all-buying-choices"),
-            (By.ID, "buybox-see-all-buying-choices-announce"),
-            (By.XPATH, "//span[contains(text(), 'See All Buying Options')]"),
-            (By.XPATH, "//a[contains(text(), 'See All Buying Options')]")
-        ]
-
-        for selector_type, selector in selectors:
+        for selector_type, selector in _BUYING_OPTION_SELECTORS:
             try:
                 elements = driver.find_elements(selector_type, selector)
                 if elements:
@@ -242,38 +403,74 @@ class ProductChecker:
 
     def _check_unavailability_messages(self, driver) -> bool:
         """Check for unavailability messages on the page."""
-        unavailable_texts = [
-            "Currently unavailable",
-            "Out of Stock",
-            "Sign up to be notified when this item becomes available",
-            "Temporarily out of stock"
-        ]
-
         try:
-            page_source = driver.page_source
-            for text in unavailable_texts:
-                if text in page_source:
-                    self.logger.info(f"Product unavailable: '{text}' found on page")
-                    return True
+            # Scan in the browser so the page source never crosses the wire
+            hit = driver.execute_script(_UNAVAILABLE_SCRIPT, _UNAVAILABLE_PATTERN)
+            if isinstance(hit, str):
+                self.logger.info(f"Product unavailable: '{hit}' found on page")
+                return True
         except Exception as e:
             self.logger.warning(f"Error checking unavailability messages: {e}")
 
         return False
 
-    @staticmethod
-    def _random_delay(min_seconds: float, max_seconds: float) -> float:
-        """Return a random delay between min and max seconds."""
+    def _random_delay(self, min_seconds: float, max_seconds: float) -> float:
+        """Return a random delay between min and max seconds, or min if random delays are off."""
+        if not self.config.random_delays:
+            return min_seconds
         return random.uniform(min_seconds, max_seconds)
 
+    def _pause(self, min_seconds: float, max_seconds: float):
+        """Pause for a human-like random delay, only when random delays are enabled."""
+        if self.config.random_delays:
+            time.sleep(self._random_delay(min_seconds, max_seconds))
+
+    def _wait(self, driver, timeout: float) -> WebDriverWait:
+        """Create a WebDriverWait polling at the configured interval."""
+        return WebDriverWait(driver, timeout, poll_frequency=self.config.wait_poll_interval)
+
+    def _wait_for_search_results(self, driver, timeout: int = 10):
+        """Wait for search results to render."""
+        try:
+            self._wait(driver, timeout).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, "div.s-result-item"))
+            )
+        except TimeoutException:
+            self.logger.debug("Search results not found within timeout")
+
+    def _wait_for_page_load(self, driver, timeout: int = 10):
+        """Wait for the document to finish loading, without failing on timeout."""
+        try:
+            self._wait(driver, timeout).until(
+                lambda d: d.execute_script("return document.readyState") == "complete"
+            )
+        except TimeoutException:
+            pass
+
     def _humanlike_typing(self, element, text: str):
-        """Type text in a human-like manner."""
+        """Type text in a human-like manner (stealth mode only, otherwise all at once)."""
+        if not self.config.stealth_mode:
+            element.send_keys(text)
+            return
+
         for char in text:
             element.send_keys(char)
             time.sleep(self._random_delay(0.05, 0.15))
 
-    @staticmethod
-    def _humanlike_click(driver, element):
-        """Click an element in a human-like way."""
+    def _humanlike_click(self, driver, element):
+        """
+        Click an element in a human-like way.
+
+        Outside stealth mode the click goes straight through JavaScript, which
+        is not blocked by overlays or the sticky header and needs one round-trip.
+        """
+        if not self.config.stealth_mode:
+            try:
+                driver.execute_script("arguments[0].click();", element)
+                return
+            except Exception as e:
+                raise ElementClickError(f"Failed to click element using JavaScript click: {e}")
+
         regular_click_error = None
         js_click_error = None
 
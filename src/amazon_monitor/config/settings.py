@@ -1,12 +1,58 @@
 import os
+import re
+import sys
 from dataclasses import dataclass
+from urllib.parse import urlsplit
 
 from dotenv import load_dotenv
 
 from ..exceptions import ConfigurationError
 
+# Slotted dataclasses need Python 3.10+; fall back to a regular dataclass on 3.9
+_DATACLASS_OPTIONS = {"slots": True} if sys.version_info >= (3, 10) else {}
 
-@dataclass
+# Amazon storefronts accepted for product_url
+AMAZON_URL_PREFIXES = (
+    "https://www.amazon.com",
+    "https://www.amazon.co.uk",
+    "https://www.amazon.de",
+)
+
+# Storefront, optional slug and ASIN of a product page URL
+_PRODUCT_URL_RE = re.compile(
+    r"^(https://www\.amazon\.[a-z.]+)/(?:([^/?#]+)/)?(?:dp|gp/product)/([A-Z0-9]{10})"
+)
+
+_BOOL_VALUES = {"true": True, "false": False, "1": True, "0": False}
+
+
+def _env_bool(name: str, default: bool = False) -> bool:
+    """Read a boolean environment variable ("true"/"false"/"1"/"0")."""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return _BOOL_VALUES.get(value.strip().lower(), default)
+
+
+def normalize_product_url(url: str) -> str:
+    """
+    Reduce a product URL to its canonical "/<slug>/dp/<ASIN>" form.
+
+    Tracking query strings and ref segments are dropped so every poll requests
+    the same URL and reloads can be served from the browser cache. URLs that
+    don't look like a product page are returned unchanged.
+    """
+    match = _PRODUCT_URL_RE.match(url)
+    if not match:
+        return url
+
+    storefront, slug, asin = match.groups()
+    if slug:
+        return f"{storefront}/{slug}/dp/{asin}"
+    return f"{storefront}/dp/{asin}"
+
+
+@dataclass(**_DATACLASS_OPTIONS)
 class Config:
     """Configuration settings for Amazon Pre-order Monitor."""
 
@@ -20,6 +66,31 @@ class Config:
     headless: bool = False
     cookie_file: str = "amazon_cookies.json"
 
+    # Session reuse (empty session_cache_dir uses a throwaway browser profile)
+    session_cache_dir: str = ""
+    clean_sessions: bool = False
+
+    # Saved cookies verified within this many seconds are trusted without a session check (0 = always check)
+    session_max_age: int = 7200
+
+    # Reuse the HTTP connection to the driver for every WebDriver command
+    keep_alive: bool = True
+
+    # When driver.get returns: "normal" (all resources), "eager" (DOM ready) or "none"
+    page_load_strategy: str = "eager"
+
+    # Block images, fonts and ad/analytics requests (also hides CAPTCHA images)
+    block_resources: bool = False
+
+    # Browsers launched in the background to replace a crashed one without a cold start
+    spare_browsers: int = 0
+
+    # Seconds between condition checks in the product page and login waits
+    wait_poll_interval: float = 1.0
+
+    # Save checkout screenshots for diagnostics (off the critical path, default off)
+    debug_screenshots: bool = False
+
     # Anti-detection settings (off by default)
     enable_anti_detection: bool = False
     randomize_user_agent: bool = False
@@ -42,12 +113,32 @@ class Config:
         if not self.product_url:
             raise ConfigurationError("Product URL is required")
 
-        if not self.product_url.startswith("https://www.amazon.com"):
+        if not self.product_url.startswith(AMAZON_URL_PREFIXES):
             raise ConfigurationError("Invalid product URL - must be Amazon product page")
 
+        self.product_url = normalize_product_url(self.product_url)
+
         if self.refresh_interval < 10:
             raise ConfigurationError("Refresh interval must be at least 10 seconds")
 
+        if self.page_load_strategy not in ("normal", "eager", "none"):
+            raise ConfigurationError("Page load strategy must be one of: normal, eager, none")
+
+        if self.session_max_age < 0:
+            raise ConfigurationError("Session max age cannot be negative")
+
+        if self.spare_browsers < 0:
+            raise ConfigurationError("Spare browsers cannot be negative")
+
+        if self.wait_poll_interval <= 0:
+            raise ConfigurationError("Wait poll interval must be greater than 0")
+
+    @property
+    def storefront(self) -> str:
+        """Origin of the product's Amazon storefront, e.g. "https://www.amazon.co.uk"."""
+        parts = urlsplit(self.product_url)
+        return f"{parts.scheme}://{parts.netloc}"
+
 def create_config_from_env() -> Config:
     """Create configuration from environment variables."""
     load_dotenv()
@@ -65,15 +156,24 @@ def create_config_from_env() -> Config:
 
     # Optional fields with defaults
     refresh_interval = int(os.getenv("REFRESH_INTERVAL", "60"))
-    headless = os.getenv("HEADLESS", "false").lower() == "true"
+    headless = _env_bool("HEADLESS")
     cookie_file = os.getenv("COOKIE_FILE", "amazon_cookies.json")
+    session_cache_dir = os.getenv("SESSION_CACHE_DIR", "")
+    clean_sessions = _env_bool("CLEAN_SESSIONS")
+    session_max_age = int(os.getenv("SESSION_MAX_AGE", "7200"))
+    keep_alive = _env_bool("KEEP_ALIVE", True)
+    page_load_strategy = os.getenv("PAGE_LOAD_STRATEGY", "eager").lower()
+    block_resources = _env_bool("BLOCK_RESOURCES")
+    spare_browsers = int(os.getenv("SPARE_BROWSERS", "0"))
+    wait_poll_interval = float(os.getenv("WAIT_POLL_INTERVAL", "1.0"))
+    debug_screenshots = _env_bool("DEBUG_SCREENSHOTS")
 
     # Anti-detection flags (default: false)
-    enable_anti_detection = os.getenv("ENABLE_ANTI_DETECTION", "false").lower() == "true"
-    randomize_user_agent = os.getenv("RANDOMIZE_USER_AGENT", "false").lower() == "true"
-    randomize_window_size = os.getenv("RANDOMIZE_WINDOW_SIZE", "false").lower() == "true"
-    random_delays = os.getenv("RANDOM_DELAYS", "false").lower() == "true"
-    stealth_mode = os.getenv("STEALTH_MODE", "false").lower() == "true"
+    enable_anti_detection = _env_bool("ENABLE_ANTI_DETECTION")
+    randomize_user_agent = _env_bool("RANDOMIZE_USER_AGENT")
+    randomize_window_size = _env_bool("RANDOMIZE_WINDOW_SIZE")
+    random_delays = _env_bool("RANDOM_DELAYS")
+    stealth_mode = _env_bool("STEALTH_MODE")
 
     return Config(
         email=email,
@@ -82,6 +182,15 @@ def create_config_from_env() -> Config:
         refresh_interval=refresh_interval,
         headless=headless,
         cookie_file=cookie_file,
+        session_cache_dir=session_cache_dir,
+        clean_sessions=clean_sessions,
+        session_max_age=session_max_age,
+        keep_alive=keep_alive,
+        page_load_strategy=page_load_strategy,
+        block_resources=block_resources,
+        spare_browsers=spare_browsers,
+        wait_poll_interval=wait_poll_interval,
+        debug_screenshots=debug_screenshots,
         enable_anti_detection=enable_anti_detection,
         randomize_user_agent=randomize_user_agent,
         randomize_window_size=randomize_window_size,
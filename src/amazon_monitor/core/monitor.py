@@ -2,21 +2,74 @@
 import logging
 import os
 import random
+import re
+import threading
 import time
+from collections import deque
+from typing import Any, Optional, Tuple
 
 from selenium import webdriver
+from selenium.common.exceptions import TimeoutException, WebDriverException
 from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.support.ui import WebDriverWait
 
 from ..amazon.auth import AmazonAuth
 from ..amazon.checkout import CheckoutHandler
-from ..amazon.product import ProductChecker
+from ..amazon.product import DRIVER_CONNECTION_ERRORS, ProductChecker
 from ..config.settings import Config
 from ..exceptions import WebDriverError
+from ..utils.cookies import CookieManager
+
+# Markers in the URL or title of Amazon's bot-check and error pages
+BOT_DETECTION_RE = re.compile(
+    r"validatecaptcha|captcha|robot_check|robot check|sorry! something went wrong",
+    re.IGNORECASE
+)
+CAPTCHA_SELECTOR = "form[action*='validateCaptcha'], #captchacharacters"
+
+# Collects every signal the quick session check needs in one round-trip
+SESSION_SIGNALS_SCRIPT = """
+    const account = document.getElementById('nav-link-accountList');
+    return {
+        url: location.href,
+        title: document.title,
+        captcha: document.querySelector(arguments[0]) !== null,
+        account: account ? account.innerText : null
+    };
+"""
+
+USER_AGENTS = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36"
+)
+
+# Injected into every new document when anti-detection is enabled
+ANTI_DETECTION_SCRIPT = """
+    Object.defineProperty(navigator, 'webdriver', {
+        get: () => undefined
+    });
+
+    window.chrome = {
+        runtime: {}
+    };
+
+    Object.defineProperty(navigator, 'plugins', {
+        get: () => [1, 2, 3, 4, 5],
+    });
+
+    Object.defineProperty(navigator, 'languages', {
+        get: () => ['en-US', 'en'],
+    });
+"""
 
 
 class PreorderMonitor:
     """Main pre-order monitoring class."""
 
+    # Browser errors in a row that are recovered from before giving up
+    MAX_CONSECUTIVE_DRIVER_ERRORS = 3
+
     def __init__(self, config: Config, browser_manager=None):
         self.config = config
         self.browser_manager = browser_manager
@@ -27,11 +80,16 @@ class PreorderMonitor:
         # Initialize the product checker and checkout handler
         self.product_checker = ProductChecker(config)
         self.checkout_handler = CheckoutHandler(config)
+        self.cookie_manager = CookieManager(config.cookie_file)
 
         # Monitoring state
         self.session_check_counter = 0
         self.check_count = 0
 
+        # Thresholds are drawn once per event rather than on every check
+        self._next_session_check = random.randint(5, 10)
+        self._next_browse = random.randint(8, 12)
+
     def start(self):
         """Start the monitoring process."""
         self.logger.info("Starting Amazon pre-order monitor...")
@@ -71,40 +129,84 @@ class PreorderMonitor:
         self.logger.info(f"Starting to monitor: {self.config.product_url}")
         self.logger.info(f"Check interval: {self.config.refresh_interval} seconds")
 
+        consecutive_driver_errors = 0
         while self.is_running:
+            # Intervals are measured from the start of each check, so time spent
+            # checking counts towards the wait
+            loop_start = time.monotonic()
+
             # Calculate interval with randomization
             interval = self._calculate_interval()
 
-            # Periodic session checks
-            if self._should_check_session():
-                if not self._handle_session_check(driver):
-                    self.logger.error("Session check failed, stopping monitor")
+            try:
+                # Periodic session checks
+                if self._should_check_session():
+                    if not self._handle_session_check(driver):
+                        self.logger.error("Session check failed, stopping monitor")
+                        return False
+
+                # Random browsing behavior
+                if self._should_do_random_browsing():
+                    self._handle_random_browsing(driver)
+
+                # Check availability, reusing the found button for the purchase
+                availability = self._check_availability(driver)
+                if availability:
+                    button, button_type = availability
+                    if self._attempt_purchase(driver, button, button_type):
+                        self.logger.info("Successfully purchased item!")
+                        return True
+                    else:
+                        self.logger.warning("Purchase attempt failed, continuing monitoring...")
+
+                consecutive_driver_errors = 0
+            except (WebDriverException, *DRIVER_CONNECTION_ERRORS) as e:
+                # Browser crashed or lost its session - swap in a fresh one and carry on
+                consecutive_driver_errors += 1
+                self.logger.warning(f"Browser error ({consecutive_driver_errors}): {e}")
+                if consecutive_driver_errors > self.MAX_CONSECUTIVE_DRIVER_ERRORS:
+                    self.logger.error("Too many consecutive browser errors, stopping monitor")
                     return False
 
-            # Random browsing behavior
-            if self._should_do_random_browsing():
-                self._handle_random_browsing(driver)
-
-            # Check availability
-            if self._check_availability(driver):
-                if self._attempt_purchase(driver):
-                    self.logger.info("Successfully purchased item!")
-                    return True
-                else:
-                    self.logger.warning("Purchase attempt failed, continuing monitoring...")
+                driver = self._recover_driver()
+                if driver is None:
+                    return False
+                continue
 
-            # Wait before next check
-            self.logger.info(f"Item not available, checking again in {interval} seconds...")
-            time.sleep(interval)
+            # Wait out whatever is left of the interval before the next check
+            sleep_for = max(0.0, loop_start + interval - time.monotonic())
+            self.logger.info(f"Item not available, checking again in {sleep_for:.1f} seconds...")
+            time.sleep(sleep_for)
 
         return False
 
+    def _recover_driver(self):
+        """Replace a crashed browser and re-establish the session; None if that fails."""
+        try:
+            driver = self.browser_manager.replace_driver()
+        except Exception as e:
+            self.logger.error(f"Could not replace browser: {e}")
+            return None
+
+        if not self._initialize_session(driver):
+            self.logger.error("Failed to re-initialize session after browser error")
+            return None
+        return driver
+
     def _initialize_session(self, driver) -> bool:
         """Initialize session with hybrid approach: quick check, then login if needed."""
         try:
+            if self.config.clean_sessions:
+                self.logger.info("Clean session requested, discarding saved cookies")
+                self.cookie_manager.clear_cookies()
+            elif self._restore_cookies(driver) and self._saved_session_is_fresh():
+                self.logger.info("Saved session is recent, skipping session check")
+                return True
+
             # First attempt: Quick session validation
             if self._quick_session_check(driver):
                 self.logger.info("Existing session is valid")
+                self.cookie_manager.save_cookies(driver)
                 return True
 
             # Session invalid or uncertain - do fresh login
@@ -113,6 +215,7 @@ class PreorderMonitor:
 
             if success:
                 self.logger.info("Successfully logged into Amazon")
+                self.cookie_manager.save_cookies(driver)
                 return True
             else:
                 self.logger.error("Login failed")
@@ -122,63 +225,73 @@ class PreorderMonitor:
             self.logger.error(f"Session initialization failed: {e}")
             return False
 
+    def _restore_cookies(self, driver) -> bool:
+        """Load saved cookies into the browser so a previous session can be reused."""
+        if not self.cookie_manager.has_valid_cookies():
+            return False
+
+        # Cookies can only be added for the domain currently loaded; robots.txt
+        # is the cheapest page on it
+        driver.get(f"{self.config.storefront}/robots.txt")
+        return self.cookie_manager.load_cookies(driver)
+
+    def _saved_session_is_fresh(self) -> bool:
+        """Whether the saved cookies were verified recently enough to trust without a check."""
+        age_days = self.cookie_manager.get_cookie_age_days()
+        if age_days is None:
+            return False
+        return age_days * 24 * 60 * 60 < self.config.session_max_age
+
     def _quick_session_check(self, driver) -> bool:
         """
         Fast session validation with strict timeout and bot detection.
         Returns True only if we're definitely logged in, False otherwise.
+
+        The URL, title and a few targeted elements are read with a single
+        script call; the full page source is never fetched.
         """
         try:
             self.logger.debug("Performing quick session check...")
 
             # Navigate with short timeout
             driver.set_page_load_timeout(15)
-            driver.get("https://www.amazon.com")
-            time.sleep(2)
+            driver.get(self.config.storefront)
 
-            current_url = driver.current_url.lower()
-            page_source_lower = driver.page_source.lower()
+            # Wait for the account link or a bot check rather than a fixed pause
+            try:
+                signals = WebDriverWait(
+                    driver, 5, poll_frequency=self.config.wait_poll_interval
+                ).until(self._decisive_session_signals)
+            except TimeoutException:
+                signals = driver.execute_script(SESSION_SIGNALS_SCRIPT, CAPTCHA_SELECTOR)
 
             # Check for bot detection first - immediate fail
-            bot_detection_indicators = [
-                "unusual traffic",
-                "captcha",
-                "enter the characters",
-                "prove you're not a robot",
-                "validatecaptcha",
-                "robot_check",
-                "sorry, something went wrong"
-            ]
-
-            for indicator in bot_detection_indicators:
-                if indicator in page_source_lower or indicator in current_url:
-                    self.logger.warning(f"Bot detection detected: {indicator}")
-                    return False
+            match = (BOT_DETECTION_RE.search(signals["url"])
+                     or BOT_DETECTION_RE.search(signals["title"]))
+            if match:
+                self.logger.warning(f"Bot detection detected: {match.group(0)}")
+                return False
 
-            # Check for sign-in indicators - if found, we're not logged in
-            if any(indicator in page_source_lower for indicator in [
-                "hello, sign in",
-                "sign in to your account",
-                "/ap/signin"
-            ]):
-                self.logger.debug("Sign-in prompts found - not logged in")
+            if signals["captcha"]:
+                self.logger.warning("Bot detection detected: captcha form")
                 return False
 
-            # Look for positive login indicators
-            try:
-                # Try to find account-related elements that only show when logged in
-                account_element = driver.find_element(By.ID, "nav-link-accountList")
-                account_text = account_element.text.strip()
+            # Look for positive login indicators on the account link only
+            if signals["account"] is not None:
+                account_text = signals["account"].strip()
+                account_text_folded = account_text.casefold()
 
-                # If it contains a name or "Hello" but not "sign in", we're probably logged in
-                if (account_text and
-                        "sign in" not in account_text.lower() and
-                        ("hello" in account_text.lower() or len(account_text.split()) > 1)):
+                # Sign-in prompt in the header - not logged in
+                if "sign in" in account_text_folded:
+                    self.logger.debug("Sign-in prompts found - not logged in")
+                    return False
 
+                # If it contains a name or "Hello", we're probably logged in
+                if account_text and ("hello" in account_text_folded or len(account_text.split()) > 1):
                     self.logger.info(f"Session appears valid - found: '{account_text}'")
                     return True
-
-            except Exception as e:
-                self.logger.debug(f"Could not find account element: {e}")
+            else:
+                self.logger.debug("Could not find account element")
 
             # If we can't determine clearly, err on the side of caution
             self.logger.debug("Session validity unclear - will attempt fresh login")
@@ -191,6 +304,15 @@ class PreorderMonitor:
             # Reset page load timeout
             driver.set_page_load_timeout(30)
 
+    @staticmethod
+    def _decisive_session_signals(driver):
+        """Session signals once the account link or a bot check is on the page, else False."""
+        signals = driver.execute_script(SESSION_SIGNALS_SCRIPT, CAPTCHA_SELECTOR)
+        if (signals["account"] is not None or signals["captcha"]
+                or BOT_DETECTION_RE.search(signals["url"]) or BOT_DETECTION_RE.search(signals["title"])):
+            return signals
+        return False
+
 
     def _calculate_interval(self) -> int:
         """Calculate a check interval with randomization."""
@@ -201,15 +323,20 @@ class PreorderMonitor:
     def _should_check_session(self) -> bool:
         """Determine if we should perform a session validity check."""
         self.session_check_counter += 1
-        if self.session_check_counter >= random.randint(5, 10):
+        if self.session_check_counter >= self._next_session_check:
             self.session_check_counter = 0
+            self._next_session_check = random.randint(5, 10)
             return True
         return False
 
     def _should_do_random_browsing(self) -> bool:
         """Determine if we should do random browsing."""
         self.check_count += 1
-        return self.check_count % random.randint(8, 12) == 0
+        if self.check_count >= self._next_browse:
+            self.check_count = 0
+            self._next_browse = random.randint(8, 12)
+            return True
+        return False
 
     def _handle_session_check(self, driver) -> bool:
         """Handle periodic session validity checks."""
@@ -219,17 +346,20 @@ class PreorderMonitor:
             return True
 
         self.logger.warning("Session invalid, attempting to re-establish...")
-        return self.auth.login(driver)
+        if self.auth.login(driver):
+            self.cookie_manager.save_cookies(driver)
+            return True
+        return False
 
     def _handle_random_browsing(self, driver):
         """Perform random browsing to appear human-like."""
         random_pages = [
-            "https://www.amazon.com/gp/bestsellers",
-            "https://www.amazon.com/gp/new-releases",
-            "https://www.amazon.com/gp/browse.html?node=16225016011",
+            "/gp/bestsellers",
+            "/gp/new-releases",
+            "/gp/browse.html?node=16225016011",
         ]
 
-        page = random.choice(random_pages)
+        page = self.config.storefront + random.choice(random_pages)
         self.logger.info(f"Visiting random page: {page}")
 
         try:
@@ -243,96 +373,200 @@ class PreorderMonitor:
         except Exception as e:
             self.logger.warning(f"Error during random browsing: {e}")
 
-    def _check_availability(self, driver) -> bool:
-        """Check if the product is available for pre-order."""
-        available, _, button_type = self.product_checker.check_availability(driver)
-
-        if available:
-            self.logger.info(f"Product available via {button_type}!")
-            return True
-
-        return False
+    def _check_availability(self, driver) -> Optional[Tuple[Any, str]]:
+        """
+        Check if the product is available for pre-order.
 
-    def _attempt_purchase(self, driver) -> bool:
-        """Attempt to purchase the item."""
+        Returns:
+            (button_element, button_type) if available, None otherwise
+        """
         available, button, button_type = self.product_checker.check_availability(driver)
 
         if available:
-            return self.checkout_handler.attempt_purchase(driver, button, button_type)
+            self.logger.info(f"Product available via {button_type}!")
+            return button, button_type
 
-        return False
+        return None
+
+    def _attempt_purchase(self, driver, button, button_type: str) -> bool:
+        """Attempt to purchase the item with the button found by the availability check."""
+        return self.checkout_handler.attempt_purchase(driver, button, button_type)
 
 
 class BrowserManager:
     """Manages browser/WebDriver lifecycle."""
 
+    # URL patterns the monitor never needs when block_resources is enabled
+    BLOCKED_URL_PATTERNS = [
+        "*.jpg", "*.jpeg", "*.png", "*.webp", "*.gif",
+        "*.woff", "*.woff2", "*.ttf",
+        "*googletagmanager*", "*doubleclick*", "*amazon-adsystem*"
+    ]
+
     def __init__(self, config: Config):
         self.config = config
         self.driver = None
         self.logger = logging.getLogger(__name__)
 
+        # Pre-warmed browsers waiting to replace the active one
+        self._spares = deque()
+        self._spares_lock = threading.Lock()
+        self._warming = []
+        self._closed = False
+
+        self._base_args, self._base_experimental = self._build_base_options()
+
+    @property
+    def spare_count(self) -> int:
+        """Number of spare browsers to keep warm (none with a persistent profile)."""
+        if self.config.session_cache_dir and not self.config.clean_sessions:
+            # Two Chrome instances cannot share one user data directory
+            return 0
+        return self.config.spare_browsers
+
     def get_driver(self):
-        """Get or create a WebDriver instance."""
+        """Get the active WebDriver, taking a pre-warmed one or creating it if needed."""
         if self.driver is None:
-            self.driver = self._create_driver()
+            self._closed = False
+            self.driver = self._take_spare() or self._create_driver()
+            self._warm_spares()
         return self.driver
 
+    def replace_driver(self):
+        """Discard the active (e.g. crashed) driver and return a fresh one."""
+        self.logger.info("Replacing browser")
+        self._quit(self.driver)
+        self.driver = None
+        return self.get_driver()
+
     def cleanup(self):
-        """Clean up browser resources."""
+        """Clean up browser resources, including spare browsers."""
+        with self._spares_lock:
+            self._closed = True
+            spares = list(self._spares)
+            self._spares.clear()
+
         if self.driver:
-            try:
-                self.driver.quit()
-                self.logger.info("Browser closed")
-            except Exception as e:
-                self.logger.warning(f"Error closing browser: {e}")
-            finally:
-                self.driver = None
+            self._quit(self.driver)
+            self.logger.info("Browser closed")
+            self.driver = None
+
+        for spare in spares:
+            self._quit(spare)
+
+    def _take_spare(self):
+        with self._spares_lock:
+            if self._spares:
+                self.logger.info("Using pre-warmed browser")
+                return self._spares.popleft()
+        return None
+
+    def _warm_spares(self):
+        """Start background browser launches until spare_count spares exist or are starting."""
+        self._warming = [thread for thread in self._warming if thread.is_alive()]
+        with self._spares_lock:
+            missing = self.spare_count - len(self._spares) - len(self._warming)
+
+        for _ in range(max(missing, 0)):
+            thread = threading.Thread(target=self._warm_spare, daemon=True)
+            thread.start()
+            self._warming.append(thread)
+
+    def _warm_spare(self):
+        """Create one spare browser (runs in a background thread)."""
+        try:
+            driver = self._create_driver()
+        except Exception as e:
+            self.logger.warning(f"Could not pre-warm browser: {e}")
+            return
 
-    def _create_driver(self):
-        """Create and configure a WebDriver instance."""
-        options = webdriver.ChromeOptions()
+        with self._spares_lock:
+            if not self._closed:
+                self._spares.append(driver)
+                return
+
+        # Manager was cleaned up while this browser was starting
+        self._quit(driver)
+
+    def _quit(self, driver):
+        if driver is None:
+            return
+        try:
+            driver.quit()
+        except Exception as e:
+            self.logger.warning(f"Error closing browser: {e}")
+
+    def _build_base_options(self):
+        """Collect the Chrome arguments and experimental options that never change per driver."""
+        args = [
+            "--window-size=1920,1080",
+            "--disable-notifications",
+            "--no-sandbox",
+            "--disable-dev-shm-usage"
+        ]
+        experimental = {}
 
-        # Basic options (always enabled)
         if self.config.headless:
-            options.add_argument("--headless")
+            args.insert(0, "--headless")
 
-        options.add_argument("--window-size=1920,1080")
-        options.add_argument("--disable-notifications")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
+        # Persistent profile so cookies/localStorage survive restarts
+        if self.config.session_cache_dir and not self.config.clean_sessions:
+            args.append(f"--user-data-dir={os.path.abspath(self.config.session_cache_dir)}")
 
         # Anti-detection measures (configurable)
-        if self.config.enable_anti_detection or self.config.stealth_mode:
-            self.logger.info("Enabling anti-detection measures")
-            options.add_argument("--disable-blink-features=AutomationControlled")
-            options.add_experimental_option("excludeSwitches", ["enable-automation"])
-            options.add_experimental_option("useAutomationExtension", False)
-            options.add_argument("--disable-web-security")
-            options.add_argument("--disable-features=VizDisplayCompositor")
+        if self.anti_detection_enabled:
+            args.extend([
+                "--disable-blink-features=AutomationControlled",
+                "--disable-web-security",
+                "--disable-features=VizDisplayCompositor"
+            ])
+            experimental["excludeSwitches"] = ["enable-automation"]
+            experimental["useAutomationExtension"] = False
+
+        return args, experimental
+
+    @property
+    def anti_detection_enabled(self) -> bool:
+        """Whether anti-detection browser options and scripts are applied."""
+        return self.config.enable_anti_detection or self.config.stealth_mode
+
+    def _create_options(self):
+        """Build ChromeOptions from the precomputed base options plus per-driver randomization."""
+        options = webdriver.ChromeOptions()
+        options.page_load_strategy = self.config.page_load_strategy
+
+        for arg in self._base_args:
+            options.add_argument(arg)
+        for name, value in self._base_experimental.items():
+            options.add_experimental_option(name, value)
 
         # Randomized user agent
         if self.config.randomize_user_agent:
-            user_agents = [
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36",
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-                "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36"
-            ]
-            import random
-            user_agent = random.choice(user_agents)
+            user_agent = random.choice(USER_AGENTS)
             options.add_argument(f"user-agent={user_agent}")
             self.logger.debug(f"Using randomized user agent: {user_agent}")
 
         # Randomized window size
         if self.config.randomize_window_size:
-            import random
             width = random.randint(1200, 1920)
             height = random.randint(800, 1080)
             options.add_argument(f"--window-size={width},{height}")
             self.logger.debug(f"Using randomized window size: {width}x{height}")
 
+        return options
+
+    def _create_driver(self):
+        """Create and configure a WebDriver instance."""
+        options = self._create_options()
+
+        if self.config.session_cache_dir and not self.config.clean_sessions:
+            self.logger.info(f"Using persistent browser profile: {self.config.session_cache_dir}")
+        if self.anti_detection_enabled:
+            self.logger.info("Enabling anti-detection measures")
+
         # Create driver with fallback strategy
         try:
-            driver = webdriver.Chrome(options=options)
+            driver = webdriver.Chrome(options=options, keep_alive=self.config.keep_alive)
             self.logger.info("Using system ChromeDriver")
         except Exception as e1:
             try:
@@ -341,35 +575,33 @@ class BrowserManager:
                 if not os.access(driver_path, os.X_OK):
                     os.chmod(driver_path, 0o755)
                 service = Service(driver_path)
-                driver = webdriver.Chrome(service=service, options=options)
+                driver = webdriver.Chrome(service=service, options=options, keep_alive=self.config.keep_alive)
                 self.logger.info("Using WebDriver Manager ChromeDriver")
             except Exception as e2:
                 raise WebDriverError(f"Could not create WebDriver: {e1}, {e2}")
 
+        # All polling is done with explicit waits; find_elements must return immediately
+        driver.implicitly_wait(0)
+
         # Inject anti-detection script if enabled
-        if self.config.enable_anti_detection or self.config.stealth_mode:
+        if self.anti_detection_enabled:
             self._inject_anti_detection_script(driver)
 
+        if self.config.block_resources:
+            self._block_resources(driver)
+
         return driver
 
+    def _block_resources(self, driver):
+        """Block heavy or tracking requests at the network layer via CDP."""
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self.BLOCKED_URL_PATTERNS})
+            self.logger.info("Blocking images, fonts and tracking requests")
+        except Exception as e:
+            self.logger.warning(f"Could not block resources: {e}")
+
     @staticmethod
     def _inject_anti_detection_script(driver):
         """Inject JavaScript to prevent bot detection."""
-        script = """
-            Object.defineProperty(navigator, 'webdriver', {
-                get: () => undefined
-            });
-            
-            window.chrome = {
-                runtime: {}
-            };
-            
-            Object.defineProperty(navigator, 'plugins', {
-                get: () => [1, 2, 3, 4, 5],
-            });
-            
-            Object.defineProperty(navigator, 'languages', {
-                get: () => ['en-US', 'en'],
-            });
-        """
-        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": script})
\ No newline at end of file
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": ANTI_DETECTION_SCRIPT})
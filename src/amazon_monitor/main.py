@@ -4,7 +4,7 @@ import sys
 
 from amazon_monitor.exceptions import ConfigurationError
 
-from .config.settings import Config, create_config_from_env
+from .config.settings import Config, create_config_from_env, normalize_product_url
 from .core.monitor import PreorderMonitor, BrowserManager
 
 
@@ -19,6 +19,8 @@ def create_config_from_args() -> Config:
     parser.add_argument("--interval", type=int, default=60, help="Check interval in seconds")
     parser.add_argument("--headless", action="store_true", help="Run in headless mode")
     parser.add_argument("--cookie-file", default="amazon_cookies.json", help="Cookie file path")
+    parser.add_argument("--session-cache-dir", help="Persistent browser profile directory")
+    parser.add_argument("--clean-sessions", action="store_true", help="Ignore saved sessions and log in fresh")
 
     # Anti-detection flags
     parser.add_argument("--enable-anti-detection", action="store_true", help="Enable anti-detection measures")
@@ -26,6 +28,9 @@ def create_config_from_args() -> Config:
     parser.add_argument("--randomize-window-size", action="store_true", help="Randomize window size")
     parser.add_argument("--random-delays", action="store_true", help="Add random delays")
     parser.add_argument("--stealth-mode", action="store_true", help="Enable stealth mode")
+    parser.add_argument("--page-load-strategy", choices=["normal", "eager", "none"],
+                        help="When page navigation is considered complete")
+    parser.add_argument("--debug-screenshots", action="store_true", help="Save checkout screenshots")
     parser.add_argument("--verbose", action="store_true", help="Enable verbose logging")
 
     args = parser.parse_args()
@@ -53,13 +58,21 @@ def create_config_from_args() -> Config:
     if args.password_encrypted:
         config.password_encrypted = args.password_encrypted
     if args.url:
-        config.product_url = args.url
+        config.product_url = normalize_product_url(args.url)
     if args.interval:
         config.refresh_interval = args.interval
     if args.headless:
         config.headless = args.headless
     if args.cookie_file:
         config.cookie_file = args.cookie_file
+    if args.session_cache_dir:
+        config.session_cache_dir = args.session_cache_dir
+    if args.clean_sessions:
+        config.clean_sessions = True
+    if args.page_load_strategy:
+        config.page_load_strategy = args.page_load_strategy
+    if args.debug_screenshots:
+        config.debug_screenshots = True
 
     # Anti-detection overrides
     if args.enable_anti_detection:
@@ -2,6 +2,7 @@ import base64
 import logging
 import re
 import secrets
+from typing import Optional
 
 import keyring
 from cryptography.fernet import Fernet, InvalidToken
@@ -19,10 +20,23 @@ class Encryption:
 
     # Update the pattern to be more specific for Fernet-encrypted strings
     ENCRYPTED_PATTERN = r'^[A-Za-z0-9_-]{20,}={0,2}$'  # Minimum length for Fernet tokens
+    _ENCRYPTED_RE = re.compile(ENCRYPTED_PATTERN)
 
-    def __init__(self):
-        """Initialize the encryption handler."""
-        self._fernet = None
+    # Marks ciphertexts that are a bare Fernet token; older values are an
+    # extra base64 layer around the token and carry no prefix
+    VERSION_PREFIX = "v2:"
+
+    # Key shared by every instance, so the keyring is only queried once per process
+    _cached_key: Optional[bytes] = None
+
+    def __init__(self, fernet: Optional[Fernet] = None):
+        """
+        Initialize the encryption handler.
+
+        Args:
+            fernet: Fernet instance to use instead of one keyed from the keyring
+        """
+        self._fernet = fernet
 
     @property
     def fernet(self) -> Fernet:
@@ -47,12 +61,24 @@ class Encryption:
             # Store the key as a string
             keyring.set_password(self.SERVICE_ID, self.KEY_USERNAME, key.decode())
             # Initialize Fernet with the key
+            Encryption._cached_key = key
             self._fernet = Fernet(key)
         except Exception as e:
             logger.error(f"Failed to store encryption key: {e}")
             raise
 
+    @classmethod
+    def clear_key_cache(cls) -> None:
+        """Forget the cached key so the next load reads the keyring again."""
+        cls._cached_key = None
+
     def _load_key(self) -> bytes:
+        """Return the process-wide encryption key, loading it on first use."""
+        if Encryption._cached_key is None:
+            Encryption._cached_key = self._read_key()
+        return Encryption._cached_key
+
+    def _read_key(self) -> bytes:
         """Load the encryption key from the system keyring or generate a new one."""
         try:
             key_str = keyring.get_password(self.SERVICE_ID, self.KEY_USERNAME)
@@ -90,11 +116,10 @@ class Encryption:
             data: String to encrypt
             
         Returns:
-            str: Base64-encoded encrypted string
+            str: Version-prefixed Fernet token
         """
         try:
-            encrypted = self.fernet.encrypt(data.encode())
-            return base64.urlsafe_b64encode(encrypted).decode()
+            return self.VERSION_PREFIX + self.fernet.encrypt(data.encode()).decode()
         except Exception as e:
             logger.error(f"Encryption failed: {e}")
             raise
@@ -104,7 +129,8 @@ class Encryption:
         Decrypt an encrypted string value.
         
         Args:
-            encrypted_data: Base64-encoded encrypted string
+            encrypted_data: Version-prefixed Fernet token, or a legacy
+                base64-wrapped token
         
         Returns:
             str: Decrypted string
@@ -113,9 +139,11 @@ class Encryption:
             Exception: If decryption fails due to a wrong key or invalid data
         """
         try:
-            decoded = base64.urlsafe_b64decode(encrypted_data)
-            decrypted = self.fernet.decrypt(decoded)
-            return decrypted.decode()
+            if encrypted_data.startswith(self.VERSION_PREFIX):
+                token = encrypted_data[len(self.VERSION_PREFIX):].encode()
+            else:
+                token = base64.urlsafe_b64decode(encrypted_data)
+            return self.fernet.decrypt(token).decode()
         except (InvalidToken, ValueError) as e:
             logger.error(f"Decryption failed: {e}")
             raise Exception(f"Failed to decrypt data: {str(e)}")
@@ -130,7 +158,9 @@ class Encryption:
         Returns:
             bool: True if the string matches an encryption pattern
         """
-        return bool(re.match(self.ENCRYPTED_PATTERN, data))
+        if data.startswith(self.VERSION_PREFIX):
+            data = data[len(self.VERSION_PREFIX):]
+        return self._ENCRYPTED_RE.match(data) is not None
 
     def rotate_key(self) -> None:
         """
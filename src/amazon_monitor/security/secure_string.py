@@ -1,26 +1,22 @@
 import ctypes
-import mmap
 import resource
 import secrets
 import warnings
 
+# Disable core dumps once for the process, so secrets can't end up in one
+try:
+    resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+except (ValueError, OSError) as e:
+    warnings.warn(f"Could not disable core dumps: {e}")
+
 
 class SecureString:
     """Secure string implementation for handling sensitive data in memory."""
 
     def __init__(self, secret: str):
-        self._length = len(secret)
-        self._buffer = ctypes.create_string_buffer(secret.encode())
-
-        # Lock memory if supported
-        if hasattr(mmap, 'mlock'):
-            try:
-                mmap.mlock(self._buffer)
-            except OSError as e:
-                warnings.warn(f"Could not lock memory: {e}")
-
-        # Disable core dumps
-        resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+        encoded = secret.encode()
+        self._length = len(encoded)
+        self._buffer = ctypes.create_string_buffer(encoded)
 
     def __del__(self):
         self._secure_wipe()
@@ -32,6 +28,7 @@ class SecureString:
             ctypes.memset(self._buffer, 0, self._length)
 
     def use_secret(self, func):
+        temp = None
         try:
             temp = self._buffer.raw[:self._length].decode()
             return func(temp)
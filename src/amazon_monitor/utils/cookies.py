@@ -1,17 +1,139 @@
 """Cookie management utilities for maintaining Amazon sessions."""
 
+import gzip
 import json
 import logging
+import mmap
+import os
+import time
 from pathlib import Path
-from typing import Optional
+from typing import Any, List, Optional, Tuple
+
+from selenium import webdriver
+
+try:
+    import orjson
+except ImportError:  # optional speedup, see the "speedups" extra
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+
+def _dumps(obj: Any, indent: bool = False) -> bytes:
+    """Serialize to JSON bytes (compact unless indent is set), using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else None)
+    if indent:
+        return json.dumps(obj, indent=2).encode()
+    return json.dumps(obj, separators=(',', ':')).encode()
+
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+# Smaller payloads are written uncompressed; gzip's header would outweigh the savings
+_COMPRESS_MIN_BYTES = 512
+
+# Files at least this large are memory-mapped instead of read into a bytes copy
+_MMAP_MIN_BYTES = 64 * 1024
+
+_SECONDS_PER_DAY = 86400.0
+
+
+def _compress(data: bytes) -> bytes:
+    """Gzip cookie JSON (level 1: most of the size win for little CPU)."""
+    if len(data) < _COMPRESS_MIN_BYTES:
+        return data
+    return gzip.compress(data, compresslevel=1)
+
+
+def _decompress(data: bytes) -> bytes:
+    """Undo _compress; plain JSON files from older versions pass through unchanged."""
+    if data.startswith(GZIP_MAGIC):
+        return gzip.decompress(data)
+    return data
+
+
+def _to_cdp_cookie(cookie: dict) -> dict:
+    """Convert a Selenium cookie dict to a CDP Network.CookieParam."""
+    cdp_cookie = {
+        key: cookie[key]
+        for key in ("name", "value", "domain", "path", "secure", "httpOnly", "sameSite")
+        if key in cookie
+    }
+    if "expiry" in cookie:
+        cdp_cookie["expires"] = cookie["expiry"]
+    return cdp_cookie
+
+
+def _live_unique_cookies(cookies: List[dict]) -> List[dict]:
+    """Drop expired cookies and keep only the last of any repeated (name, domain, path)."""
+    now = time.time()
+    latest = {}
+    for cookie in cookies:
+        if cookie.get('expiry', now) < now:
+            continue
+        latest[(cookie.get('name'), cookie.get('domain'), cookie.get('path'))] = cookie
+    return list(latest.values())
+
+
+def _loads(data: bytes) -> Any:
+    """Parse JSON bytes, using orjson when available (its errors subclass json.JSONDecodeError)."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
 
 
 class CookieManager:
     """Manages browser cookies for session persistence."""
 
+    __slots__ = ('cookie_file', '_cache')
+
     def __init__(self, cookie_file: str):
         self.cookie_file = Path(cookie_file)
-        self.logger = logging.getLogger(__name__)
+
+        # ((st_mtime_ns, st_size), cookies) of the last parse of cookie_file
+        self._cache: Optional[Tuple[Tuple[int, int], List[dict]]] = None
+
+    def _stat(self) -> Optional[os.stat_result]:
+        """Stat the cookie file once; None if it doesn't exist or can't be read."""
+        try:
+            return os.stat(self.cookie_file)
+        except OSError:
+            return None
+
+    def _read_cookies(self, st: Optional[os.stat_result] = None) -> List[dict]:
+        """
+        Parse the cookie file, reusing the last result while the file is unchanged.
+
+        Args:
+            st: A fresh stat of the cookie file, if the caller already has one
+
+        Raises:
+            FileNotFoundError: If the cookie file doesn't exist
+            json.JSONDecodeError: If the file is not valid JSON
+        """
+        if st is None:
+            st = os.stat(self.cookie_file)
+        key = (st.st_mtime_ns, st.st_size)
+        if self._cache is not None and self._cache[0] == key:
+            return self._cache[1]
+
+        # json.loads can't parse from a memory view, so mapping only pays off with orjson
+        if st.st_size >= _MMAP_MIN_BYTES and orjson is not None:
+            cookies = self._parse_mapped()
+        else:
+            cookies = _loads(_decompress(self.cookie_file.read_bytes()))
+        self._cache = (key, cookies)
+        return cookies
+
+    def _parse_mapped(self) -> List[dict]:
+        """Parse a large cookie file straight from a read-only memory map."""
+        with open(self.cookie_file, 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if mapped[:2] == GZIP_MAGIC:
+                return _loads(gzip.decompress(mapped))
+            with memoryview(mapped) as view:
+                return orjson.loads(view)
 
     def save_cookies(self, driver) -> bool:
         """
@@ -27,17 +149,39 @@ class CookieManager:
             # Ensure directory exists
             self.cookie_file.parent.mkdir(parents=True, exist_ok=True)
 
-            cookies = driver.get_cookies()
-            with open(self.cookie_file, 'w') as f:
-                json.dump(cookies, f, indent=2)
+            cookies = _live_unique_cookies(driver.get_cookies())
+            self._cache = None
+            # Human-readable only when debugging; nothing else reads the file by eye
+            readable = logger.isEnabledFor(logging.DEBUG)
+            data = _dumps(cookies, indent=readable)
+            self._write_atomic(data if readable else _compress(data))
+
+            # Seed the parse cache with what was just written, so a count or
+            # load straight after a save doesn't read the file back
+            st = self._stat()
+            if st is not None:
+                self._cache = ((st.st_mtime_ns, st.st_size), cookies)
 
-            self.logger.info(f"Saved {len(cookies)} cookies to {self.cookie_file}")
+            logger.info("Saved %d cookies to %s", len(cookies), self.cookie_file)
             return True
 
         except Exception as e:
-            self.logger.warning(f"Error saving cookies: {e}")
+            logger.warning("Error saving cookies: %s", e)
             return False
 
+    def _write_atomic(self, data: bytes):
+        """Replace the cookie file in one step, so a crash never leaves it half-written."""
+        tmp_file = self.cookie_file.with_name(self.cookie_file.name + ".tmp")
+        try:
+            # Owner-only permissions: the file holds live session cookies
+            fd = os.open(tmp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_file, self.cookie_file)
+        except Exception:
+            tmp_file.unlink(missing_ok=True)
+            raise
+
     def load_cookies(self, driver) -> bool:
         """
         Load cookies from file into driver.
@@ -49,29 +193,72 @@ class CookieManager:
             bool: True if cookies loaded successfully, False otherwise
         """
         try:
-            if not self.cookie_file.exists():
-                self.logger.info(f"Cookie file {self.cookie_file} does not exist")
+            try:
+                cookies = self._read_cookies()
+            except FileNotFoundError:
+                logger.info("Cookie file %s does not exist", self.cookie_file)
                 return False
 
-            with open(self.cookie_file, 'r') as f:
-                cookies = json.load(f)
+            # Entries without a name or value can't be set; drop them up front
+            valid = [c for c in cookies if 'name' in c and 'value' in c]
 
-            loaded_count = 0
-            for cookie in cookies:
-                try:
-                    driver.add_cookie(cookie)
-                    loaded_count += 1
-                except Exception as e:
-                    self.logger.warning(f"Failed to add cookie {cookie.get('name', 'unknown')}: {e}")
+            if self._set_cookies_via_cdp(driver, valid):
+                loaded_count = len(valid)
+            else:
+                loaded_count = self._add_cookies_one_by_one(driver, valid)
 
-            self.logger.info(f"Loaded {loaded_count}/{len(cookies)} cookies from {self.cookie_file}")
+            logger.info("Loaded %d/%d cookies from %s", loaded_count, len(cookies), self.cookie_file)
             return loaded_count > 0
 
         except json.JSONDecodeError as e:
-            self.logger.error(f"Invalid JSON in cookie file {self.cookie_file}: {e}")
+            logger.error("Invalid JSON in cookie file %s: %s", self.cookie_file, e)
+            return False
+        except Exception as e:
+            logger.warning("Error loading cookies: %s", e)
+            return False
+
+    def _set_cookies_via_cdp(self, driver, cookies: List[dict]) -> bool:
+        """Set all cookies in one CDP call on Chrome; False if not possible."""
+        if not isinstance(driver, webdriver.Chrome):
             return False
+
+        try:
+            driver.execute_cdp_cmd(
+                "Network.setCookies", {"cookies": [_to_cdp_cookie(c) for c in cookies]}
+            )
+            return True
+        except Exception as e:
+            logger.warning("Bulk cookie load failed, adding cookies one by one: %s", e)
+            return False
+
+    def _add_cookies_one_by_one(self, driver, cookies: List[dict]) -> int:
+        """
+        Add cookies through WebDriver, one request each; returns how many were added.
+
+        Cookies are added in a plain loop until one is rejected; only the
+        remainder after that goes through per-cookie error handling.
+        """
+        loaded_count = 0
+        try:
+            for cookie in cookies:
+                driver.add_cookie(cookie)
+                loaded_count += 1
+            return loaded_count
+        except Exception as e:
+            logger.warning("Failed to add cookie %s: %s", cookies[loaded_count]['name'], e)
+
+        for cookie in cookies[loaded_count + 1:]:
+            if self._safe_add(driver, cookie):
+                loaded_count += 1
+        return loaded_count
+
+    def _safe_add(self, driver, cookie: dict) -> bool:
+        """Add a single cookie, logging instead of raising if the driver rejects it."""
+        try:
+            driver.add_cookie(cookie)
+            return True
         except Exception as e:
-            self.logger.warning(f"Error loading cookies: {e}")
+            logger.warning("Failed to add cookie %s: %s", cookie['name'], e)
             return False
 
     def clear_cookies(self) -> bool:
@@ -82,12 +269,15 @@ class CookieManager:
             bool: True if cookies cleared successfully, False otherwise
         """
         try:
-            if self.cookie_file.exists():
+            self._cache = None
+            try:
                 self.cookie_file.unlink()
-                self.logger.info(f"Cleared cookies file {self.cookie_file}")
+            except FileNotFoundError:
+                return True
+            logger.info("Cleared cookies file %s", self.cookie_file)
             return True
         except Exception as e:
-            self.logger.warning(f"Error clearing cookies: {e}")
+            logger.warning("Error clearing cookies: %s", e)
             return False
 
     def get_cookie_count(self) -> int:
@@ -97,14 +287,12 @@ class CookieManager:
         Returns:
             int: Number of cookies in the file, 0 if file doesn't exist or error
         """
-        try:
-            if not self.cookie_file.exists():
-                return 0
-
-            with open(self.cookie_file, 'r') as f:
-                cookies = json.load(f)
-            return len(cookies)
+        st = self._stat()
+        if st is None or st.st_size == 0:
+            return 0
 
+        try:
+            return len(self._read_cookies(st))
         except Exception:
             return 0
 
@@ -112,10 +300,14 @@ class CookieManager:
         """
         Check if we have saved cookies that might be valid.
 
+        Only the file size is checked (anything larger than "[]"); the file
+        is parsed when the cookies are actually loaded.
+
         Returns:
-            bool: True if cookie file exists and contains cookies
+            bool: True if cookie file exists and is not an empty list
         """
-        return self.get_cookie_count() > 0
+        st = self._stat()
+        return st is not None and st.st_size > 2
 
     def get_cookie_age_days(self) -> Optional[float]:
         """
@@ -124,15 +316,8 @@ class CookieManager:
         Returns:
             Optional[float]: Age in days, None if file doesn't exist
         """
-        try:
-            if not self.cookie_file.exists():
-                return None
+        st = self._stat()
+        if st is None:
+            return None
 
-            import time
-            file_time = self.cookie_file.stat().st_mtime
-            current_time = time.time()
-            age_seconds = current_time - file_time
-            return age_seconds / (24 * 60 * 60)  # Convert to days
-
-        except Exception:
-            return None
\ No newline at end of file
+        return (time.time() - st.st_mtime) / _SECONDS_PER_DAY
\ No newline at end of file
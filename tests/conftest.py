@@ -1,50 +1,53 @@
+import base64
 import sys
+import types
 from pathlib import Path
-from unittest.mock import patch, Mock
+from unittest.mock import Mock
 
 import pytest
+
+# In-memory stand-in for the keyring package, installed before anything imports
+# it so tests never load (or probe) a real OS keyring backend
+_keyring_store = {}
+_keyring_stub = types.ModuleType("keyring")
+_keyring_stub.get_password = lambda service, username: _keyring_store.get((service, username))
+_keyring_stub.set_password = lambda service, username, password: _keyring_store.__setitem__(
+    (service, username), password
+)
+_keyring_stub.delete_password = lambda service, username: _keyring_store.pop((service, username), None)
+sys.modules["keyring"] = _keyring_stub
+
 from amazon_monitor.config.settings import Config
-from cryptography.fernet import Fernet
 
 # Add src to the Python path for testing
 src_path = Path(__file__).parent.parent / "src"
 sys.path.insert(0, str(src_path))
 
-@pytest.fixture
-def test_key():
-    """Generate a consistent test key."""
-    return Fernet.generate_key()
+# Fixed, valid Fernet key (urlsafe base64 of 32 bytes); tests only need a stable key
+TEST_KEY = base64.urlsafe_b64encode(b"\x00" * 32)
 
-@pytest.fixture
-def mock_keyring(test_key):
-    """Mock keyring for testing."""
-    with patch('keyring.get_password') as mock_get:
-        with patch('keyring.set_password') as mock_set:
-            with patch('keyring.delete_password') as mock_delete:
-                mock_get.return_value = test_key.decode()
-                yield {
-                    'get': mock_get,
-                    'set': mock_set,
-                    'delete': mock_delete
-                }
+@pytest.fixture(scope="session")
+def test_key():
+    """Provide a consistent test key."""
+    return TEST_KEY
 
-@pytest.fixture
-def encrypted_password(mock_keyring):
-    """Fixture to provide an encrypted test password."""
+@pytest.fixture(scope="session")
+def encrypted_password(test_key):
+    """Fixture to provide an encrypted test password, encrypted once per session."""
     from amazon_monitor.security.encryption import Encryption
+    _keyring_store[(Encryption.SERVICE_ID, Encryption.KEY_USERNAME)] = test_key.decode()
+    Encryption.clear_key_cache()
     encryption = Encryption()
     return encryption.encrypt("testpassword")
 
-@pytest.fixture
-def config(encrypted_password):
-    """Fixture to provide test configuration."""
+def _make_config(encrypted_password, cookie_file):
     return Config(
         email="test@example.com",
         password_encrypted=encrypted_password,
         product_url="https://www.amazon.com/dp/B123456789",
         refresh_interval=60,
         headless=True,
-        cookie_file="test_cookies.json",
+        cookie_file=str(cookie_file),
         enable_anti_detection=False,
         randomize_user_agent=False,
         randomize_window_size=False,
@@ -52,15 +55,35 @@ def config(encrypted_password):
         stealth_mode=False
     )
 
+@pytest.fixture
+def config(encrypted_password, tmp_path):
+    """Fixture to provide test configuration."""
+    return _make_config(encrypted_password, tmp_path / "test_cookies.json")
+
+@pytest.fixture(scope="module")
+def module_config(encrypted_password, tmp_path_factory):
+    """Test configuration shared by a module; tests that change settings must use `config`."""
+    return _make_config(encrypted_password, tmp_path_factory.mktemp("cookies") / "test_cookies.json")
+
+# Attributes every mock driver starts with, applied in one Mock() call
+_DRIVER_TEMPLATE = {
+    "page_source": "test page",
+    "current_url": "https://amazon.com",
+    "execute_script.return_value": "complete",
+}
+
 @pytest.fixture
 def mock_driver():
-    driver = Mock()
-    driver.page_source = "test page"
-    driver.current_url = "https://amazon.com"
-    return driver
+    return Mock(**_DRIVER_TEMPLATE)
 
 @pytest.fixture
 def mock_browser_manager(mock_driver):
     manager = Mock()
     manager.get_driver.return_value = mock_driver
-    return manager
\ No newline at end of file
+    return manager
+def pytest_collection_modifyitems(config, items):
+    """Run the encryption tests first, so their heavier fixtures are set up early.
+
+    The sort is stable, so every other test keeps its collection order.
+    """
+    items.sort(key=lambda item: item.path.name != "test_encryption.py")
@@ -53,6 +53,40 @@ def test_config_validation_integration():
             product_url="invalid-url"
         )
 
+def test_config_accepts_other_amazon_storefronts():
+    config = Config(
+        email="test@example.com",
+        password_encrypted="testpass",
+        product_url="https://www.amazon.co.uk/dp/B123456789"
+    )
+    assert config.product_url.startswith("https://www.amazon.co.uk")
+    assert config.storefront == "https://www.amazon.co.uk"
+
+def test_config_normalizes_product_url():
+    config = Config(
+        email="test@example.com",
+        password_encrypted="testpass",
+        product_url="https://www.amazon.com/Magic-Set-Box/dp/B0ABCDE123/ref=sr_1_1?crid=XYZ&keywords=mtg"
+    )
+    assert config.product_url == "https://www.amazon.com/Magic-Set-Box/dp/B0ABCDE123"
+
+def test_config_normalizes_gp_product_url():
+    config = Config(
+        email="test@example.com",
+        password_encrypted="testpass",
+        product_url="https://www.amazon.com/gp/product/B0ABCDE123?th=1"
+    )
+    assert config.product_url == "https://www.amazon.com/dp/B0ABCDE123"
+
+def test_config_rejects_unknown_page_load_strategy():
+    with pytest.raises(ConfigurationError, match="Page load strategy"):
+        Config(
+            email="test@example.com",
+            password_encrypted="testpass",
+            product_url="https://www.amazon.com/dp/B123456789",
+            page_load_strategy="fast"
+        )
+
 def test_main_error_handling():
     """Test main function error handling without actually running the monitor."""
     with patch('amazon_monitor.config.settings.load_dotenv'):
@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _no_sleep(monkeypatch):
+    """Unit tests never wait for real; tests that check sleeps patch it again."""
+    monkeypatch.setattr("time.sleep", lambda *a, **k: None)
@@ -1,6 +1,6 @@
 from unittest.mock import Mock, patch
 from amazon_monitor.amazon.checkout import CheckoutHandler
-from unittest.mock import Mock, patch
+from unittest.mock import Mock, PropertyMock, patch
 
 from amazon_monitor.amazon.checkout import CheckoutHandler
 
@@ -74,6 +74,21 @@ class TestCheckoutHandler:
 
             assert result is False
 
+    def test_attempt_direct_checkout_confirmation_timeout(self, config, mock_driver):
+        handler = CheckoutHandler(config)
+        mock_button = Mock()
+
+        # Order button found, but confirmation page never detected
+        with patch('amazon_monitor.amazon.checkout.WebDriverWait') as mock_wait:
+            from selenium.common.exceptions import TimeoutException
+            mock_wait.return_value.until.side_effect = [mock_button, TimeoutException()]
+            with patch.object(handler, '_verify_order_success', return_value=True):
+                with patch.object(handler, '_take_screenshot'):
+                    result = handler._attempt_direct_checkout(mock_driver)
+
+                    assert result is True
+                    mock_button.click.assert_called_once()
+
     def test_is_in_cart_flow_true(self, config, mock_driver):
         handler = CheckoutHandler(config)
         mock_driver.current_url = "https://www.amazon.com/cart"
@@ -83,6 +98,21 @@ class TestCheckoutHandler:
 
         assert result is True
 
+    def test_is_in_cart_flow_url_skips_page_source(self, config):
+        handler = CheckoutHandler(config)
+        driver = Mock()
+        driver.current_url = "https://www.amazon.com/gp/buy/spc/handlers/display.html?checkout=1"
+        type(driver).page_source = PropertyMock(side_effect=AssertionError("page_source fetched"))
+
+        assert handler._is_in_cart_flow(driver) is True
+
+    def test_is_in_cart_flow_from_page_source(self, config, mock_driver):
+        handler = CheckoutHandler(config)
+        mock_driver.current_url = "https://www.amazon.com/gp/product/B123456789"
+        mock_driver.page_source = "<div id='proceed-to-checkout-action'></div>"
+
+        assert handler._is_in_cart_flow(mock_driver) is True
+
     def test_is_in_cart_flow_false(self, config, mock_driver):
         handler = CheckoutHandler(config)
         mock_driver.current_url = "https://www.amazon.com/product"
@@ -110,34 +140,68 @@ class TestCheckoutHandler:
 
         assert result is False
 
+    def test_find_purchase_buttons_prefers_selector_priority_over_dom_order(self, config, mock_driver):
+        from amazon_monitor.amazon.checkout import PURCHASE_BUTTON_XPATHS, XPATH_MATCHES_SCRIPT
+
+        handler = CheckoutHandler(config)
+        preorder, add_to_cart = Mock(), Mock()
+        # A reseller's Add to Cart span comes before the pre-order input in the document
+        dom = [(add_to_cart, PURCHASE_BUTTON_XPATHS[3]), (preorder, PURCHASE_BUTTON_XPATHS[0])]
+
+        def execute_script(script, xpaths):
+            assert script == XPATH_MATCHES_SCRIPT
+            return [[element for element, matched in dom if matched == xpath] for xpath in xpaths]
+
+        mock_driver.execute_script.side_effect = execute_script
+
+        assert handler._find_purchase_buttons_in_modal(mock_driver) == [preorder]
+        mock_driver.execute_script.assert_called_once()
+
+    def test_find_purchase_buttons_none_found(self, config, mock_driver):
+        handler = CheckoutHandler(config)
+        mock_driver.execute_script.return_value = [[], [], [], [], []]
+
+        assert handler._find_purchase_buttons_in_modal(mock_driver) == []
+
     def test_find_proceed_to_checkout_button_found(self, config, mock_driver):
+        from amazon_monitor.amazon.checkout import PROCEED_TO_CHECKOUT_XPATHS, XPATH_MATCHES_SCRIPT
+
         handler = CheckoutHandler(config)
-        mock_button = Mock()
-        mock_driver.find_elements.return_value = [mock_button]
+        ptc_button, text_link = Mock(), Mock()
+        # A text match earlier in the page must not beat the buy-box id
+        mock_driver.execute_script.return_value = [[ptc_button], [], [], [text_link]]
 
         result = handler._find_proceed_to_checkout_button(mock_driver)
 
-        assert result == mock_button
+        assert result == ptc_button
+        mock_driver.execute_script.assert_called_once_with(XPATH_MATCHES_SCRIPT, PROCEED_TO_CHECKOUT_XPATHS)
 
     def test_find_proceed_to_checkout_button_not_found(self, config, mock_driver):
         handler = CheckoutHandler(config)
-        mock_driver.find_elements.return_value = []
+        mock_driver.execute_script.return_value = [[], [], [], []]
 
         result = handler._find_proceed_to_checkout_button(mock_driver)
 
         assert result is None
 
-    def test_get_element_identifier(self, config):
+    def test_get_element_identifier(self, config, mock_driver):
         handler = CheckoutHandler(config)
         mock_element = Mock()
-        mock_element.get_attribute.side_effect = lambda attr: {
-            "id": "test-id",
-            "class": "test-class"
-        }.get(attr)
+        mock_driver.execute_script.return_value = {"id": "test-id", "cls": "test-class"}
 
-        identifier = handler._get_element_identifier(mock_element)
+        identifier = handler._get_element_identifier(mock_driver, mock_element)
 
         assert identifier == "ID: test-id"
+        mock_driver.execute_script.assert_called_once()
+        mock_element.get_attribute.assert_not_called()
+
+    def test_get_element_identifier_class_fallback(self, config, mock_driver):
+        handler = CheckoutHandler(config)
+        mock_driver.execute_script.return_value = {"id": "", "cls": "test-class"}
+
+        identifier = handler._get_element_identifier(mock_driver, Mock())
+
+        assert identifier == "Class: test-class"
 
     def test_click_element_regular_click_success(self, config, mock_driver):
         handler = CheckoutHandler(config)
@@ -155,4 +219,71 @@ class TestCheckoutHandler:
         handler._click_element(mock_driver, mock_element)
 
         mock_element.click.assert_called_once()
-        mock_driver.execute_script.assert_called_once()
\ No newline at end of file
+        mock_driver.execute_script.assert_called_once()
+
+    def test_take_screenshot_disabled_by_default(self, config, mock_driver):
+        handler = CheckoutHandler(config)
+
+        handler._take_screenshot(mock_driver, "unused.png")
+
+        mock_driver.get_screenshot_as_png.assert_not_called()
+
+    def test_take_screenshot_writes_in_background(self, config, mock_driver, tmp_path):
+        config.debug_screenshots = True
+        handler = CheckoutHandler(config)
+        mock_driver.get_screenshot_as_png.return_value = b"png-bytes"
+        screenshot = tmp_path / "checkout.png"
+
+        handler._take_screenshot(mock_driver, str(screenshot))
+        handler._screenshot_executor.shutdown(wait=True)
+
+        assert screenshot.read_bytes() == b"png-bytes"
+
+    def test_scroll_to_element_does_not_sleep(self, config, mock_driver):
+        handler = CheckoutHandler(config)
+        mock_element = Mock()
+
+        with patch('time.sleep') as mock_sleep:
+            handler._scroll_to_element(mock_driver, mock_element)
+
+            mock_sleep.assert_not_called()
+            mock_driver.execute_script.assert_called_once_with(
+                "arguments[0].scrollIntoView({block: 'center'});", mock_element
+            )
+
+    def test_click_place_order_uses_cdp_on_chrome(self, config):
+        from selenium import webdriver
+
+        handler = CheckoutHandler(config)
+        driver = Mock(spec=webdriver.Chrome)
+        driver.execute_script.return_value = {"x": 100, "y": 50, "hit": True}
+        mock_button = Mock()
+
+        handler._click_place_order(driver, mock_button)
+
+        events = [c.args[1]["type"] for c in driver.execute_cdp_cmd.call_args_list]
+        assert events == ["mousePressed", "mouseReleased"]
+        mock_button.click.assert_not_called()
+
+    def test_click_place_order_covered_button_falls_back_to_click(self, config):
+        from selenium import webdriver
+
+        handler = CheckoutHandler(config)
+        driver = Mock(spec=webdriver.Chrome)
+        # Something else (e.g. an overlay) is at the button's center
+        driver.execute_script.return_value = {"x": 100, "y": 50, "hit": False}
+        mock_button = Mock()
+
+        handler._click_place_order(driver, mock_button)
+
+        driver.execute_cdp_cmd.assert_not_called()
+        mock_button.click.assert_called_once()
+
+    def test_click_place_order_falls_back_to_click(self, config, mock_driver):
+        handler = CheckoutHandler(config)
+        mock_button = Mock()
+
+        handler._click_place_order(mock_driver, mock_button)
+
+        mock_button.click.assert_called_once()
+        mock_driver.execute_cdp_cmd.assert_not_called()
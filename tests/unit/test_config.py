@@ -30,3 +30,23 @@ def test_main_error_handling():
                     with pytest.raises(ConfigurationError,
                                        match="Email is required"):
                         create_config_from_args()
+
+def test_create_config_from_env_boolean_values(encrypted_password):
+    """Boolean settings accept true/false and 1/0."""
+    from amazon_monitor.config.settings import create_config_from_env
+
+    with patch('amazon_monitor.config.settings.load_dotenv'):
+        with patch.dict('os.environ', {
+            'AMAZON_EMAIL': 'test@example.com',
+            'AMAZON_PASSWORD_ENCRYPTED': encrypted_password,
+            'PRODUCT_URL': 'https://www.amazon.com/dp/B123456789',
+            'HEADLESS': '1',
+            'STEALTH_MODE': 'TRUE',
+            'KEEP_ALIVE': '0'
+        }, clear=True):
+            config = create_config_from_env()
+
+    assert config.headless is True
+    assert config.stealth_mode is True
+    assert config.keep_alive is False
+    assert config.random_delays is False
@@ -1,111 +1,250 @@
 import json
-import json
-import tempfile
-from pathlib import Path
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 
+import pytest
 from amazon_monitor.utils.cookies import CookieManager
 
 
 class TestCookieManager:
-    def test_save_cookies_success(self):
+    def test_save_cookies_success(self, tmp_path):
         """Test successful cookie saving."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            cookie_file = Path(temp_dir) / "test_cookies.json"
-            manager = CookieManager(str(cookie_file))
+        cookie_file = tmp_path / "test_cookies.json"
+        manager = CookieManager(str(cookie_file))
 
-            mock_driver = Mock()
-            test_cookies = [
-                {'name': 'session_id', 'value': 'abc123', 'domain': '.amazon.com'},
-                {'name': 'user_pref', 'value': 'en-US', 'domain': '.amazon.com'}
-            ]
-            mock_driver.get_cookies.return_value = test_cookies
+        mock_driver = Mock()
+        test_cookies = [
+            {'name': 'session_id', 'value': 'abc123', 'domain': '.amazon.com'},
+            {'name': 'user_pref', 'value': 'en-US', 'domain': '.amazon.com'}
+        ]
+        mock_driver.get_cookies.return_value = test_cookies
 
-            result = manager.save_cookies(mock_driver)
+        result = manager.save_cookies(mock_driver)
 
-            assert result is True
-            assert cookie_file.exists()
+        assert result is True
+        assert cookie_file.exists()
 
-            # Verify file contents
-            with open(cookie_file, 'r') as f:
-                saved_cookies = json.load(f)
-            assert saved_cookies == test_cookies
+        # Verify file contents
+        with open(cookie_file, 'r') as f:
+            saved_cookies = json.load(f)
+        assert saved_cookies == test_cookies
 
-    def test_load_cookies_success(self):
+    def test_load_cookies_success(self, tmp_path):
         """Test successful cookie loading."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            cookie_file = Path(temp_dir) / "test_cookies.json"
-            manager = CookieManager(str(cookie_file))
+        cookie_file = tmp_path / "test_cookies.json"
+        manager = CookieManager(str(cookie_file))
 
-            test_cookies = [
-                {'name': 'session_id', 'value': 'abc123', 'domain': '.amazon.com'},
-                {'name': 'user_pref', 'value': 'en-US', 'domain': '.amazon.com'}
-            ]
+        test_cookies = [
+            {'name': 'session_id', 'value': 'abc123', 'domain': '.amazon.com'},
+            {'name': 'user_pref', 'value': 'en-US', 'domain': '.amazon.com'}
+        ]
 
-            # Create cookie file
-            with open(cookie_file, 'w') as f:
-                json.dump(test_cookies, f)
+        # Create cookie file
+        with open(cookie_file, 'w') as f:
+            json.dump(test_cookies, f)
 
-            mock_driver = Mock()
-            result = manager.load_cookies(mock_driver)
+        mock_driver = Mock()
+        result = manager.load_cookies(mock_driver)
 
-            assert result is True
-            assert mock_driver.add_cookie.call_count == 2
+        assert result is True
+        assert mock_driver.add_cookie.call_count == 2
 
-    def test_load_cookies_file_not_exists(self):
+    def test_load_cookies_file_not_exists(self, tmp_path):
         """Test loading cookies when file doesn't exist."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            cookie_file = Path(temp_dir) / "nonexistent.json"
-            manager = CookieManager(str(cookie_file))
+        cookie_file = tmp_path / "nonexistent.json"
+        manager = CookieManager(str(cookie_file))
 
-            mock_driver = Mock()
-            result = manager.load_cookies(mock_driver)
+        mock_driver = Mock()
+        result = manager.load_cookies(mock_driver)
 
-            assert result is False
-            mock_driver.add_cookie.assert_not_called()
+        assert result is False
+        mock_driver.add_cookie.assert_not_called()
 
-    def test_clear_cookies(self):
+    def test_clear_cookies(self, tmp_path):
         """Test clearing cookies."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            cookie_file = Path(temp_dir) / "test_cookies.json"
-            manager = CookieManager(str(cookie_file))
+        cookie_file = tmp_path / "test_cookies.json"
+        manager = CookieManager(str(cookie_file))
 
-            # Create a cookie file
-            cookie_file.write_text('[]')
-            assert cookie_file.exists()
+        # Create a cookie file
+        cookie_file.write_text('[]')
+        assert cookie_file.exists()
 
-            result = manager.clear_cookies()
+        result = manager.clear_cookies()
 
-            assert result is True
-            assert not cookie_file.exists()
+        assert result is True
+        assert not cookie_file.exists()
 
-    def test_get_cookie_count(self):
+    def test_get_cookie_count(self, tmp_path):
         """Test getting cookie count."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            cookie_file = Path(temp_dir) / "test_cookies.json"
-            manager = CookieManager(str(cookie_file))
+        cookie_file = tmp_path / "test_cookies.json"
+        manager = CookieManager(str(cookie_file))
 
-            # No file
-            assert manager.get_cookie_count() == 0
+        # No file
+        assert manager.get_cookie_count() == 0
 
-            # File with cookies
-            test_cookies = [{'name': 'test1'}, {'name': 'test2'}]
-            with open(cookie_file, 'w') as f:
-                json.dump(test_cookies, f)
+        # File with cookies
+        test_cookies = [{'name': 'test1'}, {'name': 'test2'}]
+        with open(cookie_file, 'w') as f:
+            json.dump(test_cookies, f)
 
-            assert manager.get_cookie_count() == 2
+        assert manager.get_cookie_count() == 2
 
-    def test_has_valid_cookies(self):
+    def test_has_valid_cookies(self, tmp_path):
         """Test checking for valid cookies."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            cookie_file = Path(temp_dir) / "test_cookies.json"
-            manager = CookieManager(str(cookie_file))
-
-            # No cookies
-            assert manager.has_valid_cookies() is False
-
-            # With cookies
-            with open(cookie_file, 'w') as f:
-                json.dump([{'name': 'test'}], f)
-
-            assert manager.has_valid_cookies() is True
\ No newline at end of file
+        cookie_file = tmp_path / "test_cookies.json"
+        manager = CookieManager(str(cookie_file))
+
+        # No cookies
+        assert manager.has_valid_cookies() is False
+
+        # With cookies
+        with open(cookie_file, 'w') as f:
+            json.dump([{'name': 'test'}], f)
+
+        assert manager.has_valid_cookies() is True
+
+        # Empty cookie list
+        cookie_file.write_text('[]')
+        assert manager.has_valid_cookies() is False
+
+    def test_save_and_load_without_orjson(self, monkeypatch, tmp_path):
+        """The stdlib json fallback round-trips the same cookies."""
+        import amazon_monitor.utils.cookies as cookies_module
+        monkeypatch.setattr(cookies_module, "orjson", None)
+
+        manager = CookieManager(str(tmp_path / "test_cookies.json"))
+        driver = Mock()
+        driver.get_cookies.return_value = [{'name': 'session_id', 'value': 'abc123'}]
+
+        assert manager.save_cookies(driver) is True
+        assert manager.get_cookie_count() == 1
+        assert manager.load_cookies(driver) is True
+        driver.add_cookie.assert_called_once_with({'name': 'session_id', 'value': 'abc123'})
+
+    def test_cookie_file_parsed_once_while_unchanged(self, monkeypatch, tmp_path):
+        """Count and load reuse one parse until the file changes."""
+        import amazon_monitor.utils.cookies as cookies_module
+        parse = Mock(side_effect=cookies_module._loads)
+        monkeypatch.setattr(cookies_module, "_loads", parse)
+
+        cookie_file = tmp_path / "test_cookies.json"
+        cookie_file.write_text(json.dumps([{'name': 'a', 'value': '1'}]))
+        manager = CookieManager(str(cookie_file))
+
+        assert manager.has_valid_cookies() is True
+        assert manager.get_cookie_count() == 1
+        assert manager.load_cookies(Mock()) is True
+        assert parse.call_count == 1
+
+        driver = Mock()
+        driver.get_cookies.return_value = [{'name': 'a', 'value': '1'}, {'name': 'b', 'value': '2'}]
+        manager.save_cookies(driver)
+
+        # The saved cookies are served from memory, not re-parsed
+        assert manager.get_cookie_count() == 2
+        assert parse.call_count == 1
+
+        cookie_file.write_text(json.dumps([{'name': 'c', 'value': '3'}]))
+        assert manager.get_cookie_count() == 1
+        assert parse.call_count == 2
+
+    def test_save_cookies_writes_compact_json(self, tmp_path):
+        manager = CookieManager(str(tmp_path / "test_cookies.json"))
+        driver = Mock()
+        driver.get_cookies.return_value = [{'name': 'a', 'value': '1'}]
+
+        manager.save_cookies(driver)
+
+        assert manager.cookie_file.read_text() == '[{"name":"a","value":"1"}]'
+
+    def test_save_cookies_replaces_file_atomically(self, tmp_path):
+        cookie_file = tmp_path / "test_cookies.json"
+        cookie_file.write_text('[{"name":"old","value":"0"}]')
+        manager = CookieManager(str(cookie_file))
+        driver = Mock()
+        driver.get_cookies.return_value = [{'name': 'new', 'value': '1'}]
+
+        assert manager.save_cookies(driver) is True
+
+        assert json.loads(cookie_file.read_text()) == [{'name': 'new', 'value': '1'}]
+        assert list(tmp_path.iterdir()) == [cookie_file]
+        assert cookie_file.stat().st_mode & 0o777 == 0o600
+
+    def test_load_cookies_uses_single_cdp_call_on_chrome(self, tmp_path):
+        from selenium import webdriver
+
+        cookie_file = tmp_path / "test_cookies.json"
+        cookie_file.write_text(json.dumps([
+            {'name': 'session-id', 'value': 'abc', 'domain': '.amazon.com', 'path': '/', 'expiry': 1900000000},
+            {'name': 'ubid-main', 'value': 'def', 'domain': '.amazon.com', 'path': '/'}
+        ]))
+        manager = CookieManager(str(cookie_file))
+        driver = Mock(spec=webdriver.Chrome)
+
+        assert manager.load_cookies(driver) is True
+
+        driver.add_cookie.assert_not_called()
+        driver.execute_cdp_cmd.assert_called_once_with("Network.setCookies", {"cookies": [
+            {'name': 'session-id', 'value': 'abc', 'domain': '.amazon.com', 'path': '/', 'expires': 1900000000},
+            {'name': 'ubid-main', 'value': 'def', 'domain': '.amazon.com', 'path': '/'}
+        ]})
+
+    def test_load_cookies_skips_invalid_and_rejected_cookies(self, tmp_path):
+        cookie_file = tmp_path / "test_cookies.json"
+        cookie_file.write_text(json.dumps([
+            {'name': 'session-id', 'value': 'abc'},
+            {'name': 'no-value'},
+            {'name': 'rejected', 'value': 'x'},
+            {'name': 'ubid-main', 'value': 'def'}
+        ]))
+        manager = CookieManager(str(cookie_file))
+        driver = Mock()
+        driver.add_cookie.side_effect = [None, Exception("invalid domain"), None]
+
+        assert manager.load_cookies(driver) is True
+
+        assert [c.args[0]['name'] for c in driver.add_cookie.call_args_list] == [
+            'session-id', 'rejected', 'ubid-main'
+        ]
+
+    def test_save_cookies_drops_duplicates_and_expired(self, tmp_path):
+        manager = CookieManager(str(tmp_path / "test_cookies.json"))
+        driver = Mock()
+        driver.get_cookies.return_value = [
+            {'name': 'session-token', 'value': 'old', 'domain': '.amazon.com', 'path': '/'},
+            {'name': 'expired', 'value': 'x', 'domain': '.amazon.com', 'path': '/', 'expiry': 1},
+            {'name': 'session-token', 'value': 'new', 'domain': '.amazon.com', 'path': '/'},
+            {'name': 'session-token', 'value': 'other', 'domain': 'www.amazon.com', 'path': '/'}
+        ]
+
+        manager.save_cookies(driver)
+
+        assert json.loads(manager.cookie_file.read_text()) == [
+            {'name': 'session-token', 'value': 'new', 'domain': '.amazon.com', 'path': '/'},
+            {'name': 'session-token', 'value': 'other', 'domain': 'www.amazon.com', 'path': '/'}
+        ]
+
+    def test_large_cookie_jar_is_compressed(self, tmp_path):
+        manager = CookieManager(str(tmp_path / "test_cookies.json"))
+        driver = Mock()
+        cookies = [{'name': f'cookie-{i}', 'value': 'x' * 20, 'domain': '.amazon.com', 'path': '/'}
+                   for i in range(50)]
+        driver.get_cookies.return_value = cookies
+
+        manager.save_cookies(driver)
+
+        raw = manager.cookie_file.read_bytes()
+        assert raw.startswith(b"\x1f\x8b")
+        assert len(raw) < len(json.dumps(cookies))
+        assert manager.get_cookie_count() == 50
+
+    def test_large_cookie_file_parsed_from_memory_map(self, tmp_path):
+        pytest.importorskip("orjson")
+        cookies = [{'name': f'cookie-{i}', 'value': 'x' * 100, 'domain': '.amazon.com'} for i in range(1000)]
+        cookie_file = tmp_path / "test_cookies.json"
+        cookie_file.write_text(json.dumps(cookies))
+        manager = CookieManager(str(cookie_file))
+
+        with patch.object(CookieManager, '_parse_mapped', autospec=True,
+                          side_effect=CookieManager._parse_mapped) as mock_parse:
+            assert manager.get_cookie_count() == 1000
+            mock_parse.assert_called_once()
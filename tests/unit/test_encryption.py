@@ -1,58 +1,69 @@
-from unittest.mock import patch
+import base64
+from unittest.mock import Mock
 
 import pytest
 from amazon_monitor.security.encryption import Encryption
 from cryptography.fernet import Fernet
 
+# Fixed stand-ins for freshly generated keys; these tests only need a key that
+# differs from the test key (see conftest.py), not a random one
+OTHER_KEY = base64.urlsafe_b64encode(b"\x01" * 32)
+ROTATED_KEY = base64.urlsafe_b64encode(b"\x02" * 32)
 
-class TestPasswordEncryption:
-
-    @pytest.fixture(scope="session")
-    def test_key(self):
-        """Create a consistent test key for the entire test session."""
-        return Fernet.generate_key()
 
-    @pytest.fixture
-    def mock_keyring(self):
-        """Mock keyring for testing."""
-        with patch('keyring.get_password') as mock_get:
-            with patch('keyring.set_password') as mock_set:
-                with patch('keyring.delete_password') as mock_delete:
-                    yield {
-                        'get': mock_get,
-                        'set': mock_set,
-                        'delete': mock_delete
-                    }
+class TestPasswordEncryption:
 
     @pytest.fixture
-    def encryption(self, mock_keyring):
-        """Fixture to create Encryption instance with mocked keyring."""
-        # Setup mock to return None initially (no existing key)
-        mock_keyring['get'].return_value = None
-        return Encryption()
-
-    def test_encrypt_decrypt_cycle(self, encryption):
+    def mock_keyring(self, monkeypatch):
+        """Record calls to the (stubbed, see conftest.py) keyring; no key is stored."""
+        import keyring
+        mocks = {name: Mock(return_value=None) for name in ('get', 'set', 'delete')}
+        for name, mock in mocks.items():
+            monkeypatch.setattr(keyring, f'{name}_password', mock)
+        return mocks
+
+    @pytest.fixture(scope="module")
+    def encryption(self, test_key):
+        """Encryption instance with an injected Fernet, so the keyring is never touched."""
+        return Encryption(fernet=Fernet(test_key))
+
+    @pytest.fixture(autouse=True)
+    def _reset_encryption(self, encryption):
+        """Undo per-test changes to the shared key and Fernet instance."""
+        key, fernet = Encryption._cached_key, encryption._fernet
+        yield
+        Encryption._cached_key, encryption._fernet = key, fernet
+
+    @pytest.fixture(scope="module")
+    def encrypted_samples(self, encryption):
+        """Ciphertexts for the sample passwords, encrypted once per module."""
+        return {
+            plain: encryption.encrypt(plain)
+            for plain in ("test_password_123", "plaintext123", "test123")
+        }
+
+    def test_encrypt_decrypt_cycle(self, encryption, encrypted_samples):
         """Test encrypting and decrypting a password."""
         original_password = "test_password_123"
-        encrypted = encryption.encrypt(original_password)
+        encrypted = encrypted_samples[original_password]
         decrypted = encryption.decrypt(encrypted)
 
         assert decrypted == original_password
         assert encrypted != original_password
         assert encryption.is_encrypted(encrypted) is True
 
-    def test_is_encrypted_detection(self, encryption):
+    def test_is_encrypted_detection(self, encryption, encrypted_samples):
         """Test detecting encrypted vs. plain passwords."""
         plain_password = "plaintext123"
-        encrypted_password = encryption.encrypt(plain_password)
+        encrypted_password = encrypted_samples[plain_password]
 
         assert encryption.is_encrypted(plain_password) is False
         assert encryption.is_encrypted(encrypted_password) is True
 
-    def test_password_manager(self, encryption):
+    def test_password_manager(self, encryption, encrypted_samples):
         """Test PasswordManager functionality."""
         plain_password = "test123"
-        encrypted = encryption.encrypt(plain_password)
+        encrypted = encrypted_samples[plain_password]
 
         # Test getting password from encrypted input
         result_encrypted = encryption.get_password(encrypted)
@@ -62,7 +73,7 @@ class TestPasswordEncryption:
         result_plain = encryption.get_password(plain_password)
         assert result_plain == plain_password
 
-    def test_get_plain_password(self, encryption):
+    def test_get_plain_password(self, encryption, encrypted_samples):
         """Test get_password method."""
         plain_password = "test123"
 
@@ -71,7 +82,7 @@ class TestPasswordEncryption:
         assert result == plain_password
 
         # Test with encrypted password
-        encrypted = encryption.encrypt(plain_password)
+        encrypted = encrypted_samples[plain_password]
         result = encryption.get_password(encrypted)
         assert result == plain_password
 
@@ -81,20 +92,20 @@ class TestPasswordEncryption:
         original_password = "test123"
         encrypted = encryption.encrypt(original_password)
 
-        # Replace the key with a new one
-        new_key = encryption._generate_key()
-        mock_keyring['get'].return_value = new_key.decode()
+        # Replace the key with a different one
+        mock_keyring['get'].return_value = OTHER_KEY.decode()
 
         # Force reinitialization of Fernet instance
+        Encryption.clear_key_cache()
         encryption._fernet = None
 
         # Try to decrypt with the new key
         with pytest.raises(Exception):
             encryption.decrypt(encrypted)
 
-    @pytest.mark.usefixtures("mock_keyring")
-    def test_key_rotation(self, encryption, mock_keyring):
+    def test_key_rotation(self, encryption, mock_keyring, monkeypatch):
         """Test that key rotation works correctly."""
+        monkeypatch.setattr(Encryption, '_generate_key', lambda self: ROTATED_KEY)
         test_data = "test_password"
 
         # Encrypt with initial key
@@ -110,10 +121,38 @@ class TestPasswordEncryption:
         encryption.rotate_key()
 
         # Verify rotation occurred
-        assert mock_keyring['set'].called
+        mock_keyring['set'].assert_called_once_with(
+            Encryption.SERVICE_ID, Encryption.KEY_USERNAME, ROTATED_KEY.decode()
+        )
         assert encryption._fernet is not initial_fernet
 
         # Verify new encryption works
         new_encrypted = encryption.encrypt(test_data)
         assert new_encrypted != initial_encrypted
-        assert encryption.decrypt(new_encrypted) == test_data
\ No newline at end of file
+        assert encryption.decrypt(new_encrypted) == test_data
+
+    def test_key_loaded_once_per_process(self, mock_keyring, test_key):
+        """Instances share the key, so the keyring is read only once."""
+        Encryption.clear_key_cache()
+        mock_keyring['get'].return_value = test_key.decode()
+
+        first = Encryption()
+        second = Encryption()
+        assert first.decrypt(first.encrypt("secret")) == "secret"
+        assert second.decrypt(first.encrypt("secret")) == "secret"
+
+        mock_keyring['get'].assert_called_once()
+
+    def test_decrypt_legacy_double_encoded_value(self, encryption):
+        """Values encrypted before the v2 format still decrypt."""
+        legacy = base64.urlsafe_b64encode(encryption.fernet.encrypt(b"test123")).decode()
+
+        assert encryption.is_encrypted(legacy) is True
+        assert encryption.decrypt(legacy) == "test123"
+        assert encryption.get_password(legacy) == "test123"
+
+    def test_encrypt_produces_prefixed_fernet_token(self, encryption):
+        encrypted = encryption.encrypt("test123")
+
+        assert encrypted.startswith(Encryption.VERSION_PREFIX)
+        assert encryption.fernet.decrypt(encrypted[len(Encryption.VERSION_PREFIX):].encode()) == b"test123"
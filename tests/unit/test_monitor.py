@@ -1,43 +1,57 @@
-from unittest.mock import Mock, patch
+import dataclasses
+from unittest.mock import Mock, PropertyMock, patch
 
 import pytest
-from amazon_monitor.config.settings import Config
-from amazon_monitor.core.monitor import PreorderMonitor
+from amazon_monitor.core.monitor import PreorderMonitor, BrowserManager
+from amazon_monitor.utils.cookies import CookieManager
+from selenium.common.exceptions import InvalidSessionIdException
 
 
 class TestPreorderMonitor:
     @pytest.fixture(autouse=True)
-    def setup(self, encrypted_password, mock_browser_manager):
-        """Set up test fixtures."""
-        self.config = Config(
-            email="test@example.com",
-            password_encrypted=encrypted_password,
-            product_url="https://www.amazon.com/dp/B123456789"
-        )
-        self.browser_manager = mock_browser_manager
-        self.monitor = PreorderMonitor(self.config, self.browser_manager)
-
-    def test_monitor_initialization(self, config, mock_browser_manager):
-        monitor = PreorderMonitor(config, mock_browser_manager)
-
-        assert monitor.config == config
+    def setup(self, request):
+        """Set up test fixtures; the monitor and its mocks are built on first use."""
+        self._request = request
+        self._monitor = None
+
+    @property
+    def config(self):
+        # Tests that change settings ask for the per-test `config`; the rest share one
+        name = 'config' if 'config' in self._request.fixturenames else 'module_config'
+        return self._request.getfixturevalue(name)
+
+    @property
+    def browser_manager(self):
+        return self._request.getfixturevalue('mock_browser_manager')
+
+    @property
+    def monitor(self):
+        if self._monitor is None:
+            self._monitor = PreorderMonitor(self.config, self.browser_manager)
+        return self._monitor
+
+    def test_monitor_initialization(self, mock_browser_manager):
+        monitor = self.monitor
+
+        assert monitor.config is self.config
         assert monitor.browser_manager == mock_browser_manager
         assert monitor.is_running is False
 
-    def test_start_monitoring_success(self, config, mock_browser_manager):
-        monitor = PreorderMonitor(config, mock_browser_manager)
+    def test_start_monitoring_success(self, monkeypatch):
+        monitor = self.monitor
 
         # Mock the monitoring loop to avoid infinite loop
-        with patch.object(monitor, '_monitoring_loop', return_value=True) as mock_loop:
-            monitor.start()
+        mock_loop = Mock(return_value=True)
+        monkeypatch.setattr(monitor, '_monitoring_loop', mock_loop)
+        monitor.start()
 
-            # The monitor should have tried to run the loop
-            mock_loop.assert_called_once()
-            # After start() completes, is_running should be False (cleanup)
-            assert monitor.is_running is False
+        # The monitor should have tried to run the loop
+        mock_loop.assert_called_once()
+        # After start() completes, is_running should be False (cleanup)
+        assert monitor.is_running is False
 
-    def test_stop_monitoring(self, config, mock_browser_manager):
-        monitor = PreorderMonitor(config, mock_browser_manager)
+    def test_stop_monitoring(self, mock_browser_manager):
+        monitor = self.monitor
         monitor.is_running = True
 
         monitor.stop()
@@ -46,77 +60,220 @@ class TestPreorderMonitor:
         # Verify browser cleanup was called
         mock_browser_manager.cleanup.assert_called_once()
 
-    def test_monitoring_loop_finds_available_product(self, config, mock_browser_manager, mock_driver):
-        monitor = PreorderMonitor(config, mock_browser_manager)
+    def test_monitoring_loop_finds_available_product(self, mock_browser_manager, mock_driver, monkeypatch):
+        monitor = self.monitor
         mock_browser_manager.get_driver.return_value = mock_driver
 
-        # Mock all the dependencies
-        with patch.object(monitor, '_initialize_session', return_value=True):
-            with patch.object(monitor, '_check_availability', return_value=True):
-                with patch.object(monitor, '_attempt_purchase', return_value=True):
-                    # Set is_running to False after first iteration to avoid infinite loop
-                    monitor.is_running = True
-                    def stop_after_first_check(*args):
-                        monitor.is_running = False
-                        return True
+        # Set is_running to False after first iteration to avoid infinite loop
+        monitor.is_running = True
+        def stop_after_first_check(*args):
+            monitor.is_running = False
+            return Mock(), "direct"
 
-                    with patch.object(monitor, '_check_availability', side_effect=stop_after_first_check):
-                        result = monitor._monitoring_loop()
+        monkeypatch.setattr(monitor, '_initialize_session', Mock(return_value=True))
+        monkeypatch.setattr(monitor, '_check_availability', Mock(side_effect=stop_after_first_check))
+        monkeypatch.setattr(monitor, '_attempt_purchase', Mock(return_value=True))
 
-                        assert result is True  # Successfully purchased
+        result = monitor._monitoring_loop()
 
-    def test_monitoring_loop_session_initialization_fails(self, config, mock_browser_manager, mock_driver):
-        monitor = PreorderMonitor(config, mock_browser_manager)
-        mock_browser_manager.get_driver.return_value = mock_driver
+        assert result is True  # Successfully purchased
 
-        with patch.object(monitor, '_initialize_session', return_value=False):
-            result = monitor._monitoring_loop()
+    def test_monitoring_loop_sleeps_only_remaining_interval(self, monkeypatch):
+        monitor = self.monitor
+        monitor.is_running = True
 
-            assert result is False
+        def stop(_):
+            monitor.is_running = False
 
-    def test_initialize_session_with_valid_existing_session(self, encrypted_password):
-        """Test session initialization with valid existing session."""
-        # Create a real config instead of using the mocked one
-        real_config = Config(
-            email="test@example.com",
-            password_encrypted=encrypted_password,
-            product_url="https://www.amazon.com/dp/B123456789"
-        )
+        mock_sleep = Mock(side_effect=stop)
+        monkeypatch.setattr(monitor, '_initialize_session', Mock(return_value=True))
+        monkeypatch.setattr(monitor, '_calculate_interval', Mock(return_value=60))
+        monkeypatch.setattr(monitor, '_should_check_session', Mock(return_value=False))
+        monkeypatch.setattr(monitor, '_should_do_random_browsing', Mock(return_value=False))
+        monkeypatch.setattr(monitor, '_check_availability', Mock(return_value=None))
+        monkeypatch.setattr('amazon_monitor.core.monitor.time.monotonic', Mock(side_effect=[100.0, 125.0]))
+        monkeypatch.setattr('amazon_monitor.core.monitor.time.sleep', mock_sleep)
+
+        monitor._monitoring_loop()
+
+        mock_sleep.assert_called_once_with(35.0)
+
+    def test_purchase_reuses_button_from_availability_check(self, mock_driver, monkeypatch):
+        monitor = self.monitor
+        monitor.is_running = True
+        button = object()
+        mock_check = Mock(return_value=(True, button, "direct"))
+        mock_purchase = Mock(return_value=True)
+
+        monkeypatch.setattr(monitor, '_initialize_session', Mock(return_value=True))
+        monkeypatch.setattr(monitor.product_checker, 'check_availability', mock_check)
+        monkeypatch.setattr(monitor.checkout_handler, 'attempt_purchase', mock_purchase)
+
+        assert monitor._monitoring_loop() is True
+
+        mock_check.assert_called_once_with(mock_driver)
+        mock_purchase.assert_called_once_with(mock_driver, button, "direct")
+
+    def test_monitoring_loop_recovers_from_browser_crash(self, mock_browser_manager, monkeypatch):
+        monitor = self.monitor
+        monitor.is_running = True
+        new_driver = Mock()
+        mock_browser_manager.replace_driver.return_value = new_driver
+        button = object()
+        mock_purchase = Mock(return_value=True)
+
+        monkeypatch.setattr(monitor, '_initialize_session', Mock(return_value=True))
+        monkeypatch.setattr(monitor, '_should_check_session', Mock(return_value=False))
+        monkeypatch.setattr(monitor, '_should_do_random_browsing', Mock(return_value=False))
+        monkeypatch.setattr(monitor, '_check_availability',
+                            Mock(side_effect=[InvalidSessionIdException("gone"), (button, "direct")]))
+        monkeypatch.setattr(monitor, '_attempt_purchase', mock_purchase)
+
+        assert monitor._monitoring_loop() is True
+
+        mock_browser_manager.replace_driver.assert_called_once()
+        mock_purchase.assert_called_once_with(new_driver, button, "direct")
+
+    def test_monitoring_loop_recovers_when_chromedriver_dies_mid_check(self, mock_driver, monkeypatch):
+        from urllib3.exceptions import MaxRetryError
+
+        monitor = self.monitor
+        monitor.is_running = True
+        mock_driver.get.side_effect = MaxRetryError(None, "/session/abc/url")
+        mock_recover = Mock(return_value=None)
+
+        monkeypatch.setattr(monitor, '_initialize_session', Mock(return_value=True))
+        monkeypatch.setattr(monitor, '_should_check_session', Mock(return_value=False))
+        monkeypatch.setattr(monitor, '_should_do_random_browsing', Mock(return_value=False))
+        monkeypatch.setattr(monitor, '_recover_driver', mock_recover)
+
+        assert monitor._monitoring_loop() is False
+
+        mock_recover.assert_called_once()
+
+    def test_monitoring_loop_stops_after_repeated_browser_errors(self, mock_browser_manager, monkeypatch):
+        monitor = self.monitor
+        monitor.is_running = True
+
+        monkeypatch.setattr(monitor, '_initialize_session', Mock(return_value=True))
+        monkeypatch.setattr(monitor, '_should_check_session', Mock(return_value=False))
+        monkeypatch.setattr(monitor, '_should_do_random_browsing', Mock(return_value=False))
+        monkeypatch.setattr(monitor, '_check_availability',
+                            Mock(side_effect=InvalidSessionIdException("gone")))
+
+        assert monitor._monitoring_loop() is False
 
-        # Update the monitor to use the real config
-        self.monitor.config = real_config
-        self.monitor.auth.config = real_config  # Update auth config too
+        assert mock_browser_manager.replace_driver.call_count == PreorderMonitor.MAX_CONSECUTIVE_DRIVER_ERRORS
+
+    def test_monitoring_loop_session_initialization_fails(self, mock_browser_manager, mock_driver, monkeypatch):
+        monitor = self.monitor
+        mock_browser_manager.get_driver.return_value = mock_driver
 
+        monkeypatch.setattr(monitor, '_initialize_session', Mock(return_value=False))
+        result = monitor._monitoring_loop()
+
+        assert result is False
+
+    def test_initialize_session_with_valid_existing_session(self, monkeypatch):
+        """Test session initialization with valid existing session."""
         mock_driver = Mock()
 
         # Mock both the quick session check and the full session validation
-        with patch.object(self.monitor, '_quick_session_check', return_value=True):
-            result = self.monitor._initialize_session(mock_driver)
-            assert result is True
+        monkeypatch.setattr(self.monitor, '_quick_session_check', Mock(return_value=True))
+        result = self.monitor._initialize_session(mock_driver)
+        assert result is True
 
 
-    def test_initialize_session_with_successful_login(self, config, mock_browser_manager, mock_driver):
-        monitor = PreorderMonitor(config, mock_browser_manager)
+    def test_initialize_session_with_successful_login(self, mock_driver, monkeypatch):
+        monitor = self.monitor
 
         # Mock auth: invalid session but successful login
-        with patch.object(monitor.auth, 'is_session_valid', return_value=False):
-            with patch.object(monitor.auth, 'login', return_value=True):
-                result = monitor._initialize_session(mock_driver)
+        monkeypatch.setattr(monitor.auth, 'is_session_valid', Mock(return_value=False))
+        monkeypatch.setattr(monitor.auth, 'login', Mock(return_value=True))
+        result = monitor._initialize_session(mock_driver)
 
-                assert result is True
+        assert result is True
 
-    def test_initialize_session_fails(self, config, mock_browser_manager, mock_driver):
-        monitor = PreorderMonitor(config, mock_browser_manager)
+    def test_initialize_session_fails(self, mock_driver, monkeypatch):
+        monitor = self.monitor
 
         # Mock auth: invalid session and failed login
-        with patch.object(monitor.auth, 'is_session_valid', return_value=False):
-            with patch.object(monitor.auth, 'login', return_value=False):
-                result = monitor._initialize_session(mock_driver)
-
-                assert result is False
-
-    def test_should_check_session_logic(self, config, mock_browser_manager):
-        monitor = PreorderMonitor(config, mock_browser_manager)
+        monkeypatch.setattr(monitor.auth, 'is_session_valid', Mock(return_value=False))
+        monkeypatch.setattr(monitor.auth, 'login', Mock(return_value=False))
+        result = monitor._initialize_session(mock_driver)
+
+        assert result is False
+
+    def test_initialize_session_saves_cookies_after_login(self, mock_driver, monkeypatch):
+        monitor = self.monitor
+        mock_save = Mock()
+
+        monkeypatch.setattr(monitor, '_quick_session_check', Mock(return_value=False))
+        monkeypatch.setattr(monitor.auth, 'login', Mock(return_value=True))
+        monkeypatch.setattr(CookieManager, 'save_cookies', mock_save)
+        result = monitor._initialize_session(mock_driver)
+
+        assert result is True
+        mock_save.assert_called_once_with(mock_driver)
+
+    def test_initialize_session_restores_saved_cookies(self, mock_driver, monkeypatch):
+        monitor = self.monitor
+        mock_load = Mock()
+
+        monkeypatch.setattr(CookieManager, 'has_valid_cookies', Mock(return_value=True))
+        monkeypatch.setattr(CookieManager, 'load_cookies', mock_load)
+        monkeypatch.setattr(monitor, '_quick_session_check', Mock(return_value=True))
+        result = monitor._initialize_session(mock_driver)
+
+        assert result is True
+        mock_load.assert_called_once_with(mock_driver)
+
+    def test_initialize_session_trusts_recent_saved_session(self, mock_driver, monkeypatch):
+        monitor = self.monitor
+        mock_check = Mock()
+
+        monkeypatch.setattr(CookieManager, 'has_valid_cookies', Mock(return_value=True))
+        monkeypatch.setattr(CookieManager, 'load_cookies', Mock(return_value=True))
+        monkeypatch.setattr(CookieManager, 'get_cookie_age_days', Mock(return_value=0.01))
+        monkeypatch.setattr(monitor, '_quick_session_check', mock_check)
+        result = monitor._initialize_session(mock_driver)
+
+        assert result is True
+        mock_check.assert_not_called()
+
+    def test_initialize_session_checks_stale_saved_session(self, mock_driver, monkeypatch):
+        monitor = self.monitor
+        mock_check = Mock(return_value=True)
+        mock_save = Mock()
+
+        monkeypatch.setattr(CookieManager, 'has_valid_cookies', Mock(return_value=True))
+        monkeypatch.setattr(CookieManager, 'load_cookies', Mock(return_value=True))
+        monkeypatch.setattr(CookieManager, 'get_cookie_age_days', Mock(return_value=1.0))
+        monkeypatch.setattr(monitor, '_quick_session_check', mock_check)
+        monkeypatch.setattr(CookieManager, 'save_cookies', mock_save)
+        result = monitor._initialize_session(mock_driver)
+
+        assert result is True
+        mock_check.assert_called_once_with(mock_driver)
+        mock_save.assert_called_once_with(mock_driver)
+
+    def test_initialize_session_clean_sessions_skips_cookies(self, config, mock_driver, monkeypatch):
+        config.clean_sessions = True
+        monitor = self.monitor
+        mock_load = Mock()
+        mock_clear = Mock()
+
+        monkeypatch.setattr(CookieManager, 'load_cookies', mock_load)
+        monkeypatch.setattr(CookieManager, 'clear_cookies', mock_clear)
+        monkeypatch.setattr(monitor, '_quick_session_check', Mock(return_value=False))
+        monkeypatch.setattr(monitor.auth, 'login', Mock(return_value=False))
+        monitor._initialize_session(mock_driver)
+
+        mock_clear.assert_called_once()
+        mock_load.assert_not_called()
+
+    def test_should_check_session_logic(self):
+        monitor = self.monitor
 
         # Should not check session initially
         assert monitor._should_check_session() is False
@@ -128,41 +285,187 @@ class TestPreorderMonitor:
         # Counter should reset after check
         assert monitor.session_check_counter == 0
 
-    def test_should_do_random_browsing_logic(self, config, mock_browser_manager):
-        monitor = PreorderMonitor(config, mock_browser_manager)
+    def test_should_do_random_browsing_logic(self, monkeypatch):
+        monitor = self.monitor
 
         # Should not browse initially
         assert monitor._should_do_random_browsing() is False
 
-        # Set count to trigger browsing (mock random to be predictable)
-        with patch('random.randint', return_value=1):
-            monitor.check_count = 1
-            assert monitor._should_do_random_browsing() is True
+        # Reaching the drawn threshold triggers browsing, resets the counter and draws the next one
+        monitor._next_browse = monitor.check_count + 1
+        monkeypatch.setattr('random.randint', lambda *a, **k: 10)
+        assert monitor._should_do_random_browsing() is True
+        assert monitor.check_count == 0
+        assert monitor._next_browse == 10
+        assert monitor._should_do_random_browsing() is False
+
+    def test_gating_draws_threshold_only_when_triggered(self, monkeypatch):
+        monitor = self.monitor
+        monitor._next_session_check = 5
+        mock_randint = Mock(return_value=7)
+        monkeypatch.setattr('random.randint', mock_randint)
+
+        results = [monitor._should_check_session() for _ in range(5)]
+
+        assert results == [False, False, False, False, True]
+        mock_randint.assert_called_once_with(5, 10)
+        assert monitor._next_session_check == 7
 
-    def test_handle_random_browsing(self, config, mock_browser_manager, mock_driver):
-        monitor = PreorderMonitor(config, mock_browser_manager)
+    def test_handle_random_browsing(self, mock_driver, monkeypatch):
+        monitor = self.monitor
 
-        # Mock time.sleep to speed up test
-        with patch('time.sleep'):
-            with patch('random.choice', return_value="https://www.amazon.com/gp/bestsellers"):
-                with patch('random.uniform', return_value=1.0):
-                    with patch('random.randint', return_value=1):
-                        monitor._handle_random_browsing(mock_driver)
+        # Stub out randomness to make the test deterministic
+        monkeypatch.setattr('random.choice', lambda *a, **k: "/gp/bestsellers")
+        monkeypatch.setattr('random.uniform', lambda *a, **k: 1.0)
+        monkeypatch.setattr('random.randint', lambda *a, **k: 1)
+        monitor._handle_random_browsing(mock_driver)
 
-                        # Verify driver was used
-                        mock_driver.get.assert_called_with("https://www.amazon.com/gp/bestsellers")
-                        mock_driver.execute_script.assert_called()
+        # Verify driver was used
+        mock_driver.get.assert_called_with("https://www.amazon.com/gp/bestsellers")
+        mock_driver.execute_script.assert_called()
 
-    def test_calculate_interval_with_randomization(self, config, mock_browser_manager):
-        monitor = PreorderMonitor(config, mock_browser_manager)
+    def test_calculate_interval_with_randomization(self, monkeypatch):
+        monitor = self.monitor
 
-        # Test with large interval (should add randomization)
-        monitor.config.refresh_interval = 60
-        with patch('random.randint', return_value=5):
-            interval = monitor._calculate_interval()
-            assert interval == 65  # 60 + 5
+        # Test with large interval (should add randomization); the config is
+        # shared, so swap in changed copies rather than mutating it
+        monitor.config = dataclasses.replace(monitor.config, refresh_interval=60)
+        monkeypatch.setattr('random.randint', lambda *a, **k: 5)
+        interval = monitor._calculate_interval()
+        assert interval == 65  # 60 + 5
 
         # Test with small interval (no randomization)
-        monitor.config.refresh_interval = 10
+        monitor.config = dataclasses.replace(monitor.config, refresh_interval=10)
         interval = monitor._calculate_interval()
-        assert interval == 10
\ No newline at end of file
+        assert interval == 10
+
+    @staticmethod
+    def _session_signals(url="https://www.amazon.com/", title="Amazon.com", captcha=False, account=None):
+        return {"url": url, "title": title, "captcha": captcha, "account": account}
+
+    def test_quick_session_check_logged_in_without_page_source(self):
+        monitor = self.monitor
+        driver = Mock()
+        type(driver).page_source = PropertyMock(side_effect=AssertionError("page_source fetched"))
+        driver.execute_script.return_value = self._session_signals(account="Hello, Alex\nAccount & Lists")
+
+        assert monitor._quick_session_check(driver) is True
+
+        driver.execute_script.assert_called_once()
+        driver.find_element.assert_not_called()
+        driver.find_elements.assert_not_called()
+
+    def test_quick_session_check_waits_for_account_link(self):
+        monitor = self.monitor
+        driver = Mock()
+        driver.execute_script.side_effect = [
+            self._session_signals(),
+            self._session_signals(account="Hello, Alex\nAccount & Lists")
+        ]
+
+        assert monitor._quick_session_check(driver) is True
+
+        assert driver.execute_script.call_count == 2
+
+    def test_quick_session_check_detects_captcha_form(self):
+        monitor = self.monitor
+        driver = Mock()
+        driver.execute_script.return_value = self._session_signals(captcha=True)
+
+        assert monitor._quick_session_check(driver) is False
+
+    def test_quick_session_check_detects_robot_check_title(self):
+        monitor = self.monitor
+        driver = Mock()
+        driver.execute_script.return_value = self._session_signals(title="Robot Check")
+
+        assert monitor._quick_session_check(driver) is False
+
+    def test_quick_session_check_sign_in_prompt(self):
+        monitor = self.monitor
+        driver = Mock()
+        driver.execute_script.return_value = self._session_signals(account="Hello, sign in\nAccount & Lists")
+
+        assert monitor._quick_session_check(driver) is False
+
+class TestBrowserManager:
+    def test_create_driver_uses_keep_alive(self, config):
+        manager = BrowserManager(config)
+
+        with patch('amazon_monitor.core.monitor.webdriver.Chrome') as mock_chrome:
+            manager._create_driver()
+
+            assert mock_chrome.call_args.kwargs['keep_alive'] is True
+
+    def test_create_driver_sets_page_load_strategy(self, config):
+        manager = BrowserManager(config)
+
+        with patch('amazon_monitor.core.monitor.webdriver.Chrome') as mock_chrome:
+            manager._create_driver()
+
+            assert mock_chrome.call_args.kwargs['options'].page_load_strategy == "eager"
+
+    def test_create_driver_blocks_resources_when_enabled(self, config):
+        config.block_resources = True
+        manager = BrowserManager(config)
+
+        with patch('amazon_monitor.core.monitor.webdriver.Chrome'):
+            driver = manager._create_driver()
+
+            driver.execute_cdp_cmd.assert_any_call(
+                "Network.setBlockedURLs", {"urls": BrowserManager.BLOCKED_URL_PATTERNS}
+            )
+
+    def test_create_driver_disables_implicit_wait(self, config):
+        manager = BrowserManager(config)
+
+        with patch('amazon_monitor.core.monitor.webdriver.Chrome'):
+            driver = manager._create_driver()
+
+            driver.implicitly_wait.assert_called_once_with(0)
+
+    def test_create_driver_keep_alive_disabled(self, config):
+        config.keep_alive = False
+        manager = BrowserManager(config)
+
+        with patch('amazon_monitor.core.monitor.webdriver.Chrome') as mock_chrome:
+            manager._create_driver()
+
+            assert mock_chrome.call_args.kwargs['keep_alive'] is False
+
+    def test_replace_driver_uses_pre_warmed_browser(self, config):
+        config.spare_browsers = 1
+        manager = BrowserManager(config)
+        first, spare, refill = Mock(), Mock(), Mock()
+
+        with patch.object(manager, '_create_driver', side_effect=[first, spare, refill]):
+            assert manager.get_driver() is first
+            for thread in manager._warming:
+                thread.join()
+
+            assert manager.replace_driver() is spare
+            first.quit.assert_called_once()
+            for thread in manager._warming:
+                thread.join()
+
+        manager.cleanup()
+        spare.quit.assert_called_once()
+        refill.quit.assert_called_once()
+
+    def test_no_spares_with_persistent_profile(self, config):
+        config.spare_browsers = 2
+        config.session_cache_dir = "profile"
+
+        assert BrowserManager(config).spare_count == 0
+
+    def test_create_options_reuses_precomputed_base_options(self, config):
+        config.stealth_mode = True
+        manager = BrowserManager(config)
+
+        first = manager._create_options()
+        second = manager._create_options()
+
+        assert "--headless" in first.arguments
+        assert "--disable-blink-features=AutomationControlled" in first.arguments
+        assert first.arguments == second.arguments
+        assert first.experimental_options["excludeSwitches"] == ["enable-automation"]
@@ -0,0 +1,24 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+SRC_PATH = Path(__file__).parent.parent.parent / "src"
+
+
+def test_import_does_not_load_selenium():
+    """Importing the package for Config alone should not pull in Selenium."""
+    code = (
+        "import sys, amazon_monitor; "
+        "assert amazon_monitor.Config; "
+        "assert 'selenium' not in sys.modules"
+    )
+    env = {**os.environ, "PYTHONPATH": str(SRC_PATH)}
+    subprocess.run([sys.executable, "-c", code], check=True, env=env)
+
+
+def test_lazy_exports_resolve():
+    import amazon_monitor
+    from amazon_monitor.core.monitor import PreorderMonitor
+
+    assert amazon_monitor.PreorderMonitor is PreorderMonitor
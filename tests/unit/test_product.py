@@ -1,131 +1,274 @@
-from unittest.mock import Mock, patch
-from amazon_monitor.amazon.product import ProductChecker
+import re
 from unittest.mock import Mock, patch
 
-from amazon_monitor.amazon.product import ProductChecker
+import pytest
+from amazon_monitor.amazon.product import ProductChecker, _search_term_from_url
+from selenium.common.exceptions import (
+    InvalidSessionIdException,
+    StaleElementReferenceException,
+    TimeoutException,
+    WebDriverException
+)
+from urllib3.exceptions import MaxRetryError, ProtocolError
 
 
-class TestProductChecker:
-    def test_check_availability_direct_button_found(self, config, mock_driver):
-        checker = ProductChecker(config)
-        mock_button = Mock()
+# Stand-in for a found button; the tests only check it is passed through unchanged
+BUTTON = object()
+NOT_FOUND = (False, None, None)
+
+
+@pytest.fixture(scope="module")
+def checker(module_config):
+    """ProductChecker shared by the tests that leave its config alone."""
+    return ProductChecker(module_config)
 
-        # Mock the methods called by check_availability
-        with patch.object(checker, 'simulate_human_browsing'):
-            with patch.object(checker, '_navigate_to_product'):
-                with patch.object(checker, '_check_direct_preorder_buttons', return_value=(True, mock_button, "direct")):
-                    available, button, button_type = checker.check_availability(mock_driver)
 
-        assert available is True
-        assert button == mock_button
-        assert button_type == "direct"
+@pytest.fixture
+def isolated_checker(config):
+    """ProductChecker for tests that change config settings."""
+    return ProductChecker(config)
 
-    def test_check_availability_buying_options_found(self, config, mock_driver):
-        checker = ProductChecker(config)
-        mock_button = Mock()
 
+class TestProductChecker:
+    @pytest.mark.parametrize("direct, buying, unavailable, expected", [
+        ((True, BUTTON, "direct"), None, None, (True, BUTTON, "direct")),
+        (NOT_FOUND, (True, BUTTON, "buying_options"), None, (True, BUTTON, "buying_options")),
+        (NOT_FOUND, NOT_FOUND, True, NOT_FOUND),
+    ], ids=["direct_button_found", "buying_options_found", "unavailable_message"])
+    def test_check_availability(self, checker, mock_driver, monkeypatch, direct, buying, unavailable, expected):
         # Mock the methods called by check_availability
-        with patch.object(checker, 'simulate_human_browsing'):
-            with patch.object(checker, '_navigate_to_product'):
-                with patch.object(checker, '_check_direct_preorder_buttons', return_value=(False, None, None)):
-                    with patch.object(checker, '_check_buying_options_buttons', return_value=(True, mock_button, "buying_options")):
-                        available, button, button_type = checker.check_availability(mock_driver)
+        monkeypatch.setattr(checker, 'simulate_human_browsing', lambda *a: None)
+        monkeypatch.setattr(checker, '_navigate_to_product', lambda *a: None)
+        monkeypatch.setattr(checker, '_check_direct_preorder_buttons', lambda *a: direct)
+        if buying is not None:
+            monkeypatch.setattr(checker, '_check_buying_options_buttons', lambda *a: buying)
+        if unavailable is not None:
+            monkeypatch.setattr(checker, '_check_unavailability_messages', lambda *a: unavailable)
 
-        assert available is True
-        assert button == mock_button
-        assert button_type == "buying_options"
+        assert checker.check_availability(mock_driver) == expected
 
-    def test_check_availability_unavailable_message(self, config, mock_driver):
-        checker = ProductChecker(config)
+    def test_simulate_human_browsing(self, config, isolated_checker, mock_driver):
+        config.enable_anti_detection = True
+
+        with patch.object(isolated_checker, '_simulate_referrer_visit'):
+            with patch.object(isolated_checker, '_scroll_page'):
+                with patch.object(isolated_checker, '_check_images'):
+                    with patch.object(isolated_checker, '_scroll_back_to_top'):
+                        isolated_checker.simulate_human_browsing(mock_driver)
+
+                        # Verify human-like actions were called
+                        isolated_checker._simulate_referrer_visit.assert_called_once()
+                        isolated_checker._scroll_page.assert_called_once()
+                        isolated_checker._check_images.assert_called_once()
+                        isolated_checker._scroll_back_to_top.assert_called_once()
+
+    def test_simulate_human_browsing_skipped_without_anti_detection(self, checker, mock_driver):
+        with patch.object(checker, '_simulate_referrer_visit') as mock_referrer:
+            checker.simulate_human_browsing(mock_driver)
+
+            mock_referrer.assert_not_called()
+            mock_driver.get.assert_not_called()
+
+    def test_random_delay_fixed_without_random_delays(self, checker):
+        assert checker._random_delay(1, 3) == 1
+
+    @pytest.mark.parametrize("method, elements, expected", [
+        ("_check_direct_preorder_buttons", [BUTTON], (True, BUTTON, "direct")),
+        ("_check_direct_preorder_buttons", [], NOT_FOUND),
+        ("_check_buying_options_buttons", [BUTTON], (True, BUTTON, "buying_options")),
+        ("_check_buying_options_buttons", [], NOT_FOUND),
+    ], ids=["direct_found", "direct_not_found", "buying_options_found", "buying_options_not_found"])
+    def test_button_checks(self, checker, mock_driver, method, elements, expected):
+        mock_driver.find_elements.return_value = elements
+
+        assert getattr(checker, method)(mock_driver) == expected
+
+    def test_check_unavailability_messages_found(self, checker, mock_driver):
+        mock_driver.execute_script.return_value = "Currently unavailable"
+
+        result = checker._check_unavailability_messages(mock_driver)
+
+        assert result is True
+
+    def test_unavailability_phrases_scanned_with_one_pattern(self, checker, mock_driver):
+        from amazon_monitor.amazon.product import _UNAVAILABLE_PATTERN, _UNAVAILABLE_SCRIPT, _UNAVAILABLE_TEXTS
+        mock_driver.execute_script.return_value = None
+
+        checker._check_unavailability_messages(mock_driver)
+
+        mock_driver.execute_script.assert_called_once_with(_UNAVAILABLE_SCRIPT, _UNAVAILABLE_PATTERN)
+        pattern = re.compile(_UNAVAILABLE_PATTERN)
+        assert all(pattern.fullmatch(text) for text in _UNAVAILABLE_TEXTS)
+        assert pattern.search("In Stock. Ships from Amazon.") is None
+
+    def test_check_unavailability_messages_not_found(self, checker, mock_driver):
+        mock_driver.execute_script.return_value = None
+
+        result = checker._check_unavailability_messages(mock_driver)
+
+        assert result is False
+
+    @pytest.mark.parametrize("url, expected", [
+        ("https://www.amazon.com/Magic-Gathering-Product-Name/dp/B123456789", "Magic Gathering Product Name"),
+        # Default URL without product name
+        ("https://www.amazon.com/dp/B123456789", "new products"),
+    ])
+    def test_extract_product_name_from_url(self, url, expected):
+        assert _search_term_from_url(url) == expected
+
+    def test_navigate_to_product_waits_without_sleeping(self, checker, mock_driver):
+        with patch('amazon_monitor.amazon.product.WebDriverWait') as mock_wait:
+            with patch('time.sleep') as mock_sleep:
+                checker._navigate_to_product(mock_driver)
+
+                mock_driver.get.assert_called_once_with(checker.config.product_url)
+                mock_wait.return_value.until.assert_called_once()
+                mock_sleep.assert_not_called()
+
+    def test_waits_use_configured_poll_interval(self, config, isolated_checker, mock_driver):
+        config.wait_poll_interval = 2.0
+
+        with patch('amazon_monitor.amazon.product.WebDriverWait') as mock_wait:
+            isolated_checker._navigate_to_product(mock_driver)
+
+            mock_wait.assert_called_once_with(mock_driver, 15, poll_frequency=2.0)
+
+    def test_navigate_to_product_reloads_when_already_there(self, checker, mock_driver):
+        mock_driver.current_url = checker.config.product_url
+
+        with patch('amazon_monitor.amazon.product.WebDriverWait'):
+            checker._navigate_to_product(mock_driver)
+
+            mock_driver.refresh.assert_called_once()
+            mock_driver.get.assert_not_called()
+
+    def test_pause_only_when_random_delays_enabled(self, config, isolated_checker):
+        with patch('time.sleep') as mock_sleep:
+            isolated_checker._pause(1, 2)
+            mock_sleep.assert_not_called()
+
+            config.random_delays = True
+            isolated_checker._pause(1, 2)
+            mock_sleep.assert_called_once()
+
+    def test_check_availability_uses_single_probe(self, checker, mock_driver):
+        mock_driver.execute_script.return_value = {
+            "kind": "direct", "by": "css selector", "selector": "#preorder-button"
+        }
+        mock_driver.find_element.return_value = BUTTON
 
-        # Mock the methods called by check_availability
         with patch.object(checker, 'simulate_human_browsing'):
             with patch.object(checker, '_navigate_to_product'):
-                with patch.object(checker, '_check_direct_preorder_buttons', return_value=(False, None, None)):
-                    with patch.object(checker, '_check_buying_options_buttons', return_value=(False, None, None)):
-                        with patch.object(checker, '_check_unavailability_messages', return_value=True):
-                            available, button, button_type = checker.check_availability(mock_driver)
+                available, button, button_type = checker.check_availability(mock_driver)
 
-        assert available is False
-        assert button is None
-        assert button_type is None
+        assert (available, button, button_type) == (True, BUTTON, "direct")
+        mock_driver.find_element.assert_called_once_with("css selector", "#preorder-button")
+        mock_driver.find_elements.assert_not_called()
 
-    def test_simulate_human_browsing(self, config, mock_driver):
-        checker = ProductChecker(config)
+    def test_resolve_probe_unavailable(self, checker, mock_driver):
+        result = checker._resolve_probe(
+            mock_driver, {"kind": "unavailable", "phrase": "Currently unavailable"}
+        )
 
-        with patch.object(checker, '_simulate_referrer_visit'):
-            with patch.object(checker, '_scroll_page'):
-                with patch.object(checker, '_check_images'):
-                    with patch.object(checker, '_scroll_back_to_top'):
-                        checker.simulate_human_browsing(mock_driver)
+        assert result == (False, None, None)
+        mock_driver.find_element.assert_not_called()
 
-                        # Verify human-like actions were called
-                        checker._simulate_referrer_visit.assert_called_once()
-                        checker._scroll_page.assert_called_once()
-                        checker._check_images.assert_called_once()
-                        checker._scroll_back_to_top.assert_called_once()
+    @pytest.mark.parametrize("probe, expected", [
+        ({"kind": "unavailable", "phrase": "#outOfStock"}, NOT_FOUND),
+        ({"kind": "unavailable", "phrase": "Currently unavailable"}, NOT_FOUND),
+        # Amazon itself is out of stock (#outOfStock) but other sellers are offered
+        ({"kind": "buying_options", "by": "css selector", "selector": "#buybox-see-all-buying-choices"},
+         (True, BUTTON, "buying_options")),
+        ({"kind": "none"}, NOT_FOUND),
+    ], ids=["out_of_stock", "unavailable_phrase", "out_of_stock_other_sellers", "none"])
+    def test_check_availability_follows_probe(self, checker, mock_driver, monkeypatch, probe, expected):
+        monkeypatch.setattr(checker, '_navigate_to_product', lambda *a: None)
+        mock_driver.execute_script.return_value = probe
+        mock_driver.find_element.return_value = BUTTON
 
-    def test_check_direct_preorder_buttons_found(self, config, mock_driver):
-        checker = ProductChecker(config)
-        mock_button = Mock()
-        mock_driver.find_elements.return_value = [mock_button]
+        assert checker.check_availability(mock_driver) == expected
 
-        available, button, button_type = checker._check_direct_preorder_buttons(mock_driver)
+        # The probe's answer is final: no per-selector fallback, and a button is
+        # only looked up when the probe found one
+        mock_driver.find_elements.assert_not_called()
+        assert mock_driver.find_element.called is expected[0]
 
-        assert available is True
-        assert button == mock_button
-        assert button_type == "direct"
+    def test_perform_search_builds_url_without_stealth(self, checker, mock_driver):
+        with patch.object(checker, '_wait_for_search_results'):
+            checker._perform_search(mock_driver, "magic the gathering")
 
-    def test_check_direct_preorder_buttons_not_found(self, config, mock_driver):
-        checker = ProductChecker(config)
-        mock_driver.find_elements.return_value = []
+        mock_driver.get.assert_called_once_with("https://www.amazon.com/s?k=magic+the+gathering")
+        mock_driver.find_element.assert_not_called()
 
-        available, button, button_type = checker._check_direct_preorder_buttons(mock_driver)
+    def test_perform_search_types_in_stealth_mode(self, config, isolated_checker, mock_driver):
+        config.stealth_mode = True
+        search_box = mock_driver.find_element.return_value
 
-        assert available is False
-        assert button is None
-        assert button_type is None
+        with patch.object(isolated_checker, '_humanlike_typing') as mock_typing:
+            with patch.object(isolated_checker, '_wait_for_search_results'):
+                isolated_checker._perform_search(mock_driver, "magic")
 
-    def test_check_buying_options_buttons_found(self, config, mock_driver):
-        checker = ProductChecker(config)
-        mock_button = Mock()
-        mock_driver.find_elements.return_value = [mock_button]
+        mock_driver.get.assert_not_called()
+        mock_typing.assert_called_once_with(search_box, "magic")
 
-        available, button, button_type = checker._check_buying_options_buttons(mock_driver)
+    def test_humanlike_typing_single_send_without_stealth(self, checker):
+        element = Mock()
 
-        assert available is True
-        assert button == mock_button
-        assert button_type == "buying_options"
+        with patch('time.sleep') as mock_sleep:
+            checker._humanlike_typing(element, "abc")
 
-    def test_check_unavailability_messages_found(self, config, mock_driver):
-        checker = ProductChecker(config)
-        mock_driver.page_source = "Currently unavailable - We don't know when this item will be back in stock."
+        element.send_keys.assert_called_once_with("abc")
+        mock_sleep.assert_not_called()
 
-        result = checker._check_unavailability_messages(mock_driver)
+    def test_humanlike_typing_per_character_in_stealth_mode(self, config, isolated_checker):
+        config.stealth_mode = True
+        element = Mock()
 
-        assert result is True
+        isolated_checker._humanlike_typing(element, "abc")
 
-    def test_check_unavailability_messages_not_found(self, config, mock_driver):
-        checker = ProductChecker(config)
-        mock_driver.page_source = "Add to Cart - In stock and ready to ship"
+        assert element.send_keys.call_count == 3
 
-        result = checker._check_unavailability_messages(mock_driver)
+    def test_humanlike_click_uses_js_without_stealth(self, checker, mock_driver):
+        element = Mock()
 
-        assert result is False
+        checker._humanlike_click(mock_driver, element)
+
+        element.click.assert_not_called()
+        mock_driver.execute_script.assert_called_once_with("arguments[0].click();", element)
+
+    def test_humanlike_click_prefers_native_click_in_stealth_mode(self, config, isolated_checker, mock_driver):
+        config.stealth_mode = True
+        element = Mock()
+
+        isolated_checker._humanlike_click(mock_driver, element)
 
-    def test_extract_product_name_from_url(self, config):
-        # Update config with a URL that has a product name
-        config.product_url = "https://www.amazon.com/Magic-Gathering-Product-Name/dp/B123456789"
-        checker = ProductChecker(config)
+        element.click.assert_called_once()
+        mock_driver.execute_script.assert_not_called()
 
-        name = checker._extract_product_name_from_url()
+    @pytest.mark.parametrize("error", [
+        InvalidSessionIdException("gone"),
+        WebDriverException("chrome not reachable"),
+        MaxRetryError(None, "/session/abc/url"),
+        ProtocolError("Connection aborted."),
+    ], ids=["invalid_session", "chrome_not_reachable", "max_retry", "protocol_error"])
+    def test_check_availability_propagates_dead_browser(self, checker, mock_driver, error):
+        with patch.object(checker, '_navigate_to_product', side_effect=error):
+            with pytest.raises(type(error)):
+                checker.check_availability(mock_driver)
 
-        assert name == "Magic Gathering Product Name"
+    def test_check_availability_propagates_dead_browser_during_probe(self, checker, mock_driver, monkeypatch):
+        monkeypatch.setattr(checker, '_navigate_to_product', lambda *a: None)
+        mock_driver.execute_script.side_effect = WebDriverException("chrome not reachable")
 
-    def test_extract_product_name_fallback(self, config):
-        # Use default URL without product name
-        checker = ProductChecker(config)
+        with pytest.raises(WebDriverException):
+            checker.check_availability(mock_driver)
 
-        name = checker._extract_product_name_from_url()
+        mock_driver.find_elements.assert_not_called()
 
-        assert name == "new products"
\ No newline at end of file
+    @pytest.mark.parametrize("error", [
+        StaleElementReferenceException("stale"),
+        TimeoutException("slow page"),
+    ], ids=["stale_element", "page_load_timeout"])
+    def test_check_availability_page_errors_report_unavailable(self, checker, mock_driver, error):
+        with patch.object(checker, '_navigate_to_product', side_effect=error):
+            assert checker.check_availability(mock_driver) == NOT_FOUND